@@ -0,0 +1,18 @@
+from users.models import User
+
+
+def scope_consultations(queryset, user):
+    """
+    Ограничивает доступ к данным:
+    - admin/is_staff: видят всё
+    - doctor: только свои консультации
+    """
+    if getattr(user, "is_staff", False) or getattr(user, "role", None) == User.ADMIN:
+        return queryset
+
+    if getattr(user, "role", None) == User.DOCTOR:
+        if user.profile is None:
+            return queryset.none()
+        return queryset.filter(doctor=user.profile)
+
+    return queryset.none()
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Clinic, Consultation
+from .models import Clinic, Consultation, ScheduleBreak, ScheduleTemplate
 
 
 @admin.register(Clinic)
@@ -18,3 +18,24 @@ class ConsultationAdmin(admin.ModelAdmin):
     date_hierarchy = "start_date"
     ordering = ("-start_date",)
     raw_id_fields = ("clinic", "doctor", "patient")
+
+
+class ScheduleBreakInline(admin.TabularInline):
+    model = ScheduleBreak
+    extra = 0
+
+
+@admin.register(ScheduleTemplate)
+class ScheduleTemplateAdmin(admin.ModelAdmin):
+    list_display = (
+        "doctor",
+        "clinic",
+        "weekday",
+        "start_time",
+        "end_time",
+        "slot_duration",
+    )
+    list_filter = ("weekday", "clinic", "doctor")
+    ordering = ("doctor", "weekday", "start_time")
+    raw_id_fields = ("clinic", "doctor")
+    inlines = (ScheduleBreakInline,)
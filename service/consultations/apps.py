@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ConsultationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'consultations'
+
+    def ready(self):
+        from consultations import signals  # noqa: F401
@@ -0,0 +1,113 @@
+"""
+Вспомогательные функции для management-команд bench_*: синтетические
+данные, которые откатываются после замера, и измерение времени.
+"""
+
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from consultations.models import Clinic, Consultation
+from consultations.search import build_search_text
+from users.models import Doctor, Patient, User
+
+FIRST_NAMES = ["Иван", "Анна", "Петр", "Мария", "Олег", "Елена", "Сергей", "Ольга"]
+MIDDLE_NAMES = ["Иванович", "Петровна", "Сергеевич", "Олеговна", "Андреевич"]
+LAST_NAMES = ["Иванов", "Петрова", "Смирнов", "Кузнецова", "Попов", "Соколова"]
+
+
+def _create_users(role, count, batch_size):
+    users = [
+        User(
+            email=f"bench-{role}-{index}@example.com",
+            username=f"bench-{role}-{index}@example.com",
+            password="!",
+            first_name=random.choice(FIRST_NAMES),
+            middle_name=random.choice(MIDDLE_NAMES),
+            last_name=f"{random.choice(LAST_NAMES)}{index}",
+            role=role,
+        )
+        for index in range(count)
+    ]
+    return User.objects.bulk_create(users, batch_size=batch_size)
+
+
+@contextmanager
+def seeded_consultations(count, batch_size=5000):
+    """
+    Создает count консультаций (половина занята пациентами) вместе с врачами,
+    пациентами и клиниками внутри транзакции и откатывает все по выходу.
+    """
+    random.seed(count)
+    now = timezone.now()
+    with transaction.atomic():
+        try:
+            clinics = Clinic.objects.bulk_create(
+                Clinic(name=f"Bench {index}", legal_address="-", actual_address="-")
+                for index in range(10)
+            )
+            doctors = Doctor.objects.bulk_create(
+                Doctor(user=user, speciality="Терапевт")
+                for user in _create_users(
+                    User.DOCTOR, max(1, count // 2000), batch_size
+                )
+            )
+            patients = Patient.objects.bulk_create(
+                (
+                    Patient(user=user, phone="79990000000")
+                    for user in _create_users(
+                        User.PATIENT, max(1, count // 50), batch_size
+                    )
+                ),
+                batch_size=batch_size,
+            )
+
+            pending = []
+            for index in range(count):
+                # Слоты врача идут подряд и не пересекаются
+                start = now + timedelta(minutes=30 * (index // len(doctors)) + 30)
+                doctor = doctors[index % len(doctors)]
+                patient = random.choice(patients) if index % 2 else None
+                pending.append(
+                    Consultation(
+                        clinic=clinics[index % len(clinics)],
+                        doctor=doctor,
+                        patient=patient,
+                        status=(
+                            Consultation.CONFIRMED
+                            if index % 2
+                            else Consultation.CREATED
+                        ),
+                        start_date=start,
+                        end_date=start + timedelta(minutes=30),
+                        search_text=build_search_text(
+                            doctor.user, patient.user if patient else None
+                        ),
+                    )
+                )
+                if len(pending) >= batch_size:
+                    Consultation.objects.bulk_create(pending)
+                    pending = []
+            Consultation.objects.bulk_create(pending)
+
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE")
+            yield
+        finally:
+            transaction.set_rollback(True)
+
+
+def measure(func, repeat=5):
+    """Возвращает минимальное и медианное время вызова func в миллисекундах."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), statistics.median(timings)
@@ -0,0 +1,85 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Now
+from django.utils import timezone
+
+from consultations.list_cache import invalidate_list_cache
+from consultations.locks import Lease
+from consultations.models import Consultation
+from consultations.search import build_search_text
+
+
+class SlotHold(Lease):
+    """
+    Кратковременное удержание слота пациентом на время записи.
+    Захват выполняется одной атомарной командой SET NX в Redis, поэтому
+    остальные пациенты получают отказ, не обращаясь к базе данных.
+    """
+
+    KEY = "consultations:hold:{}"
+    CONTENTION_KEY = "consultations:hold:contention:{}"
+    TOTAL_CONTENTION_KEY = "consultations:hold:contention"
+
+    def __init__(self, consultation_id, user_id):
+        super().__init__(
+            consultation_id,
+            token=str(user_id),
+            ttl=settings.CONSULTATIONS_SLOT_HOLD_TTL,
+        )
+        self.consultation_id = consultation_id
+
+    def acquire(self):
+        # Повторный запрос того же пациента (двойной клик) не считается конфликтом
+        if super().acquire() or cache.get(self.key) == self.token:
+            return True
+        self._count(
+            self.CONTENTION_KEY.format(self.consultation_id),
+            int(settings.CONSULTATIONS_SLOT_CONTENTION_TTL.total_seconds()),
+        )
+        self._count(self.TOTAL_CONTENTION_KEY)
+        return False
+
+    def held_by_other(self):
+        holder = cache.get(self.key)
+        return holder is not None and holder != self.token
+
+    @staticmethod
+    def _count(key, timeout=None):
+        # Срок задается при создании счетчика, incr его не продлевает
+        cache.add(key, 0, timeout=timeout)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=timeout)
+
+    @classmethod
+    def contention(cls, consultation_id=None):
+        """Количество отказов в удержании по слоту или по всем слотам."""
+        if consultation_id is None:
+            return cache.get(cls.TOTAL_CONTENTION_KEY, 0)
+        return cache.get(cls.CONTENTION_KEY.format(consultation_id), 0)
+
+
+def book_consultation(consultation_id, patient, now=None):
+    """
+    Записывает пациента на свободную будущую консультацию одним условным
+    UPDATE. Возвращает True, если запись удалась, и False, если консультация
+    уже занята, началась или не существует.
+    """
+    if now is None:
+        now = timezone.now()
+
+    booked = Consultation.objects.filter(
+        pk=consultation_id, patient__isnull=True, start_date__gt=now
+    ).update(
+        patient=patient,
+        status=Consultation.CONFIRMED,
+        search_text=Concat(
+            F("search_text"), Value(" " + build_search_text(patient.user))
+        ),
+        updated_at=Now(),
+    )
+    if booked:
+        invalidate_list_cache()
+    return bool(booked)
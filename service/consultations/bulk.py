@@ -0,0 +1,245 @@
+"""
+Пакетное создание, изменение и удаление консультаций.
+
+Операции пакета проверяются вместе (существование связанных объектов,
+права и пересечения интервалов врача с учетом остальных операций)
+и применяются в одной транзакции через bulk_create/bulk_update.
+Если хотя бы одна операция не прошла проверку, пакет не применяется.
+"""
+
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from consultations.access import scope_consultations
+from consultations.list_cache import invalidate_list_cache
+from consultations.models import Clinic, Consultation
+from consultations.scheduler import schedule_status_transitions
+from consultations.search import build_search_text
+from users.models import Doctor, Patient, User
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+FIELDS = ("clinic", "doctor", "patient", "status", "start_date", "end_date")
+
+# Как и в ConsultationCreateView, без end_date консультация длится 30 минут
+DEFAULT_DURATION = timedelta(minutes=30)
+
+
+class Batch:
+    """Пакет операций пользователя: проверка, применение и результаты."""
+
+    def __init__(self, operations, user):
+        self.operations = operations
+        self.user = user
+        self.errors = {}
+        self.is_admin = (
+            getattr(user, "is_staff", False)
+            or getattr(user, "role", None) == User.ADMIN
+        )
+
+    def error(self, index, field, message):
+        self.errors.setdefault(index, {}).setdefault(field, []).append(message)
+
+    def load(self):
+        ids = [item["id"] for item in self.operations if item["op"] != CREATE]
+        self.targets = {
+            consultation.pk: consultation
+            for consultation in scope_consultations(
+                Consultation.objects.all(), self.user
+            ).filter(pk__in=ids)
+        }
+        self.clinics = set(
+            Clinic.objects.filter(
+                pk__in={item["clinic"] for item in self.operations if "clinic" in item}
+            ).values_list("pk", flat=True)
+        )
+        doctor_ids = {item["doctor"] for item in self.operations if "doctor" in item}
+        patient_ids = {
+            item["patient"] for item in self.operations if item.get("patient")
+        }
+        if not self.is_admin:
+            doctor_ids.add(self.user.profile.pk)
+        for consultation in self.targets.values():
+            doctor_ids.add(consultation.doctor_id)
+            if consultation.patient_id:
+                patient_ids.add(consultation.patient_id)
+        self.doctors = Doctor.objects.select_related("user").in_bulk(doctor_ids)
+        self.patients = Patient.objects.select_related("user").in_bulk(patient_ids)
+
+    def own_doctor(self, index, doctor_id):
+        if self.is_admin:
+            return doctor_id
+        profile = self.user.profile
+        if doctor_id is not None and doctor_id != profile.pk:
+            self.error(index, "doctor", "Врач может менять только свои консультации.")
+        return profile.pk
+
+    def resolve(self, index, item):
+        """Итоговое состояние консультации после операции или None."""
+        if item["op"] == CREATE:
+            consultation = Consultation(status=Consultation.CREATED)
+        else:
+            consultation = self.targets.get(item["id"])
+            if consultation is None:
+                self.error(index, "id", "Консультация не найдена.")
+                return None
+            if item["op"] == DELETE:
+                return consultation
+
+        values = {field: item[field] for field in FIELDS if field in item}
+        if item["op"] == CREATE or "doctor" in values:
+            values["doctor"] = self.own_doctor(index, values.get("doctor"))
+        if item["op"] == CREATE and "end_date" not in values:
+            values["end_date"] = values["start_date"] + DEFAULT_DURATION
+
+        if "clinic" in values and values["clinic"] not in self.clinics:
+            self.error(index, "clinic", "Клиника не найдена.")
+        if "doctor" in values and values["doctor"] not in self.doctors:
+            self.error(index, "doctor", "Врач не найден.")
+        if values.get("patient") and values["patient"] not in self.patients:
+            self.error(index, "patient", "Пациент не найден.")
+
+        for field, value in values.items():
+            if field in ("clinic", "doctor", "patient"):
+                setattr(consultation, f"{field}_id", value)
+            else:
+                setattr(consultation, field, value)
+        if consultation.end_date <= consultation.start_date:
+            self.error(index, "end_date", "Окончание должно быть позже начала.")
+        return consultation
+
+    def check_overlaps(self, changed):
+        """Пересечения интервалов врачей с учетом всех операций пакета."""
+        if not changed:
+            return
+        touched = {item["id"] for item in self.operations if item["op"] != CREATE}
+        intervals = {}
+        existing = (
+            Consultation.objects.filter(
+                doctor_id__in={c.doctor_id for c in changed.values()},
+                start_date__lt=max(c.end_date for c in changed.values()),
+                end_date__gt=min(c.start_date for c in changed.values()),
+            )
+            .exclude(pk__in=touched)
+            .values_list("doctor_id", "start_date", "end_date")
+        )
+        for doctor_id, start, end in existing:
+            intervals.setdefault(doctor_id, []).append((start, end, None))
+        for index, consultation in changed.items():
+            intervals.setdefault(consultation.doctor_id, []).append(
+                (consultation.start_date, consultation.end_date, index)
+            )
+
+        for doctor_intervals in intervals.values():
+            doctor_intervals.sort(key=lambda interval: interval[:2])
+            latest = None
+            for interval in doctor_intervals:
+                if latest is not None and interval[0] < latest[1]:
+                    for _, _, index in (latest, interval):
+                        if index is not None:
+                            self.error(
+                                index, "start_date", Consultation.DOCTOR_OVERLAP_ERROR
+                            )
+                if latest is None or interval[1] > latest[1]:
+                    latest = interval
+
+    def validate(self):
+        self.load()
+        self.resolved = {}
+        seen = set()
+        for index, item in enumerate(self.operations):
+            if item["op"] != CREATE:
+                if item["id"] in seen:
+                    self.error(index, "id", "Консультация уже есть в пакете.")
+                seen.add(item["id"])
+            self.resolved[index] = self.resolve(index, item)
+
+        self.check_overlaps(self.changed())
+        return not self.errors
+
+    def changed(self):
+        """Созданные и измененные операциями консультации без ошибок."""
+        return {
+            index: consultation
+            for index, consultation in self.resolved.items()
+            if consultation is not None
+            and self.operations[index]["op"] != DELETE
+            and index not in self.errors
+        }
+
+    def search_text(self, consultation):
+        patient = self.patients.get(consultation.patient_id)
+        return build_search_text(
+            self.doctors[consultation.doctor_id].user,
+            patient.user if patient else None,
+        )
+
+    def apply(self):
+        by_op = {CREATE: [], UPDATE: [], DELETE: []}
+        for index, consultation in self.resolved.items():
+            by_op[self.operations[index]["op"]].append(consultation)
+
+        now = timezone.now()
+        for consultation in by_op[CREATE] + by_op[UPDATE]:
+            consultation.search_text = self.search_text(consultation)
+            consultation.updated_at = now
+
+        with transaction.atomic():
+            if by_op[DELETE]:
+                Consultation.objects.filter(
+                    pk__in=[consultation.pk for consultation in by_op[DELETE]]
+                ).delete()
+            if by_op[UPDATE]:
+                Consultation.objects.bulk_update(
+                    by_op[UPDATE], [*FIELDS, "search_text", "updated_at"]
+                )
+            if by_op[CREATE]:
+                Consultation.objects.bulk_create(by_op[CREATE])
+            for consultation in by_op[CREATE] + by_op[UPDATE]:
+                schedule_status_transitions(consultation, now=now)
+        invalidate_list_cache()
+
+    def results(self):
+        return [
+            (
+                {"index": index, "op": item["op"], "errors": self.errors[index]}
+                if index in self.errors
+                else {
+                    "index": index,
+                    "op": item["op"],
+                    "id": getattr(self.resolved.get(index), "pk", None),
+                }
+            )
+            for index, item in enumerate(self.operations)
+        ]
+
+
+def apply_operations(operations, user):
+    """
+    Проверяет и применяет пакет операций пользователя. Возвращает признак
+    применения и результаты по каждой операции в порядке пакета.
+    """
+    batch = Batch(operations, user)
+    if not batch.validate():
+        return False, batch.results()
+    try:
+        batch.apply()
+    except IntegrityError as error:
+        # На PostgreSQL пересечения дополнительно отсекает ограничение в БД:
+        # между проверкой и записью консультации врача изменились
+        if not Consultation.is_doctor_overlap(error):
+            raise
+        batch.check_overlaps(batch.changed())
+        if not batch.errors:
+            # Конфликтующая запись успела исчезнуть, виновника не найти
+            for index, item in enumerate(operations):
+                if item["op"] != DELETE:
+                    batch.error(
+                        index, "start_date", Consultation.DOCTOR_OVERLAP_ERROR
+                    )
+        return False, batch.results()
+    return True, batch.results()
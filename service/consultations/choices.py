@@ -0,0 +1,33 @@
+"""
+Списки выбора клиники и врача для форм консультаций.
+
+Список строится одним запросом (врачи вместе с пользователями) и хранится
+в кэше до изменения клиник, врачей или ФИО врачей.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CLINIC_CHOICES_KEY = "consultations:choices:clinic"
+DOCTOR_CHOICES_KEY = "consultations:choices:doctor"
+
+
+def cached_choices(key, field):
+    """Варианты ModelChoiceField из кэша вместо запроса при каждой отрисовке."""
+    choices = cache.get(key)
+    if choices is None:
+        choices = [(obj.pk, field.label_from_instance(obj)) for obj in field.queryset]
+        cache.set(
+            key,
+            choices,
+            timeout=int(settings.CONSULTATIONS_CHOICES_CACHE_TTL.total_seconds()),
+        )
+    if field.empty_label is not None:
+        return [("", field.empty_label), *choices]
+    return choices
+
+
+def forget_choices(*keys):
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,63 @@
+"""
+Валидаторы условных GET (If-None-Match) для списка и карточки консультации.
+Они считаются до основных запросов и отрисовки шаблона: список
+версионируется поколением кэша списка, карточка — полем updated_at
+консультации. Last-Modified не отдается: If-Modified-Since сравнивает
+только время и не учел бы пользователя, сессию, CSRF и удержание слота.
+"""
+
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.middleware.csrf import get_token
+
+from consultations.booking import SlotHold
+from consultations.list_cache import list_generation
+from consultations.models import Consultation
+
+
+def _fingerprint(request, *parts):
+    # Страницы содержат формы с CSRF-токеном, а вход в систему меняет секрет
+    # CSRF и ключ сессии: после повторного входа старая копия страницы
+    # с устаревшим токеном не должна подтверждаться через 304. get_token
+    # заводит секрет, если cookie еще нет, и ответ установит тот же секрет
+    get_token(request)
+    parts = (*parts, request.META["CSRF_COOKIE"], request.session.session_key)
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+
+
+def _uncacheable(request):
+    # Анонимного пользователя перенаправит LoginRequiredMixin, а ожидающие
+    # сообщения должны попасть в ответ, а не потеряться за 304
+    return not request.user.is_authenticated or len(get_messages(request)) > 0
+
+
+def list_etag(request, *args, **kwargs):
+    if _uncacheable(request):
+        return None
+    # Страница содержит блок ближайших консультаций и ссылки по правам
+    # пользователя, поэтому версия зависит от него
+    return _fingerprint(
+        request, list_generation(), request.user.pk, sorted(request.GET.lists())
+    )
+
+
+def consultation_version(request, pk):
+    if not hasattr(request, "_consultation_version"):
+        request._consultation_version = (
+            Consultation.objects.filter(pk=pk)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+    return request._consultation_version
+
+
+def detail_etag(request, pk, *args, **kwargs):
+    if _uncacheable(request):
+        return None
+    updated_at = consultation_version(request, pk)
+    if updated_at is None:
+        return None
+    # Удержание слота другим пациентом меняет карточку без записи в БД
+    held = SlotHold(pk, request.user.pk).held_by_other()
+    return _fingerprint(request, updated_at.isoformat(), request.user.pk, held)
@@ -1,5 +1,10 @@
 from django import forms
 
+from consultations.choices import (
+    CLINIC_CHOICES_KEY,
+    DOCTOR_CHOICES_KEY,
+    cached_choices,
+)
 from consultations.models import Consultation
 from users.models import Doctor
 
@@ -7,14 +12,22 @@ from users.models import Doctor
 class ConsultationCreateForm(forms.ModelForm):
     def __init__(self, *args, user=None, **kwargs):
         super().__init__(*args, **kwargs)
-        if user is not None:
-            try:
-                doctor = Doctor.objects.get(user=user)
-            except Doctor.DoesNotExist:
-                doctor = None
-            if doctor is not None and "doctor" in self.fields:
-                self.fields["doctor"].queryset = Doctor.objects.filter(pk=doctor.pk)
-                self.fields["doctor"].initial = doctor
+        # Doctor.__str__ выводит пользователя: без select_related
+        # отрисовка списка врачей делала запрос на каждого врача
+        self.fields["doctor"].queryset = Doctor.objects.select_related("user")
+        doctor = getattr(user, "profile", None) if user is not None else None
+        if isinstance(doctor, Doctor):
+            self.fields["doctor"].queryset = Doctor.objects.select_related(
+                "user"
+            ).filter(pk=doctor.pk)
+            self.fields["doctor"].initial = doctor
+        else:
+            self.fields["doctor"].choices = cached_choices(
+                DOCTOR_CHOICES_KEY, self.fields["doctor"]
+            )
+        self.fields["clinic"].choices = cached_choices(
+            CLINIC_CHOICES_KEY, self.fields["clinic"]
+        )
 
     start_date = forms.DateTimeField(
         label="Начало",
@@ -34,3 +47,18 @@ class ConsultationCreateForm(forms.ModelForm):
             "doctor": "Врач",
             "status": "Статус",
         }
+
+
+class ConsultationUpdateForm(forms.ModelForm):
+    class Meta:
+        model = Consultation
+        fields = ["clinic", "doctor", "patient", "status", "start_date", "end_date"]
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date = cleaned_data.get("start_date")
+        end_date = cleaned_data.get("end_date")
+        # На PostgreSQL обратный интервал ломает tstzrange в ограничении
+        if start_date and end_date and end_date <= start_date:
+            self.add_error("end_date", "Окончание должно быть позже начала.")
+        return cleaned_data
@@ -0,0 +1,121 @@
+"""
+Кэш страниц списка консультаций.
+
+Ключ страницы содержит номер поколения: любое изменение консультаций
+увеличивает его, и все ранее закэшированные страницы перестают читаться
+и вытесняются по TTL. Одновременные промахи по одному ключу не идут в БД
+всей толпой: страницу строит тот, кто взял блокировку, остальные ждут.
+"""
+
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from consultations.search import search_tokens
+
+GENERATION_KEY = "consultations:list:generation"
+PAGE_KEY = "consultations:list:{}:{}:{}"
+LOCK_KEY = "consultations:list:lock:{}"
+HITS_KEY = "consultations:list:hits"
+MISSES_KEY = "consultations:list:misses"
+
+LIST_PARAMS = ("status", "sort", "order", "page", "pagination", "cursor")
+
+# Интервал опроса кэша, пока страницу строит другой запрос
+LOCK_POLL_INTERVAL = 0.05
+
+
+def list_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Начальное значение от времени, а не 1: после вытеснения счетчика
+        # номера поколений не повторяются и старые страницы не оживают
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_list_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate_list_cache():
+    """
+    Сбрасывает кэш списка сразу и повторно после фиксации транзакции,
+    чтобы страница, построенная по еще не зафиксированным данным,
+    не пережила изменение.
+    """
+    bump_list_generation()
+    transaction.on_commit(bump_list_generation)
+
+
+def normalize_list_params(query):
+    """Параметры запроса списка, от которых зависит страница."""
+    params = {name: query.get(name, "").strip() for name in LIST_PARAMS}
+    params["status"] = ",".join(
+        sorted({status.strip() for status in params["status"].split(",")} - {""})
+    )
+    params["q"] = " ".join(search_tokens(query.get("q", "")))
+    return params
+
+
+def _page_key(scope, params):
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return PAGE_KEY.format(list_generation(), scope, digest)
+
+
+def _count(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def cached_page(scope, params, loader):
+    """
+    Возвращает закэшированный результат loader() для области видимости
+    scope (роль и профиль) и нормализованных параметров запроса.
+    """
+    timeout = int(settings.CONSULTATIONS_LIST_CACHE_TTL.total_seconds())
+    if timeout <= 0:
+        return loader()
+
+    key = _page_key(scope, params)
+    value = cache.get(key)
+    if value is not None:
+        _count(HITS_KEY)
+        return value
+
+    lock_key = LOCK_KEY.format(key)
+    lock_timeout = int(settings.CONSULTATIONS_LIST_CACHE_LOCK_TTL.total_seconds())
+    if not cache.add(lock_key, 1, timeout=lock_timeout):
+        deadline = time.monotonic() + lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = cache.get(key)
+            if value is not None:
+                _count(HITS_KEY)
+                return value
+        # Строящий запрос не уложился в блокировку: строим сами, не кэшируя
+        _count(MISSES_KEY)
+        return loader()
+
+    _count(MISSES_KEY)
+    try:
+        value = loader()
+        cache.set(key, value, timeout=timeout)
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+def cache_stats():
+    return {"hits": cache.get(HITS_KEY, 0), "misses": cache.get(MISSES_KEY, 0)}
@@ -0,0 +1,88 @@
+import threading
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+# Проверка токена и продление/удаление одной командой: между отдельными
+# GET и EXPIRE/DEL аренда могла истечь и достаться другому держателю
+RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("expire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class Lease:
+    """
+    Аренда на кэше (Redis) для задач, которые не должны выполняться
+    параллельно. Держатель аренды идентифицируется токеном, поэтому его
+    можно передать подзадачам для продления и освобождения.
+    """
+
+    KEY = "consultations:lease:{}"
+
+    def __init__(self, name, token=None, ttl=None):
+        self.name = name
+        self.key = self.KEY.format(name)
+        self.token = token or uuid.uuid4().hex
+        if ttl is None:
+            ttl = settings.CONSULTATIONS_MAINTENANCE_LEASE_TTL
+        self.ttl = int(ttl.total_seconds())
+
+    def acquire(self):
+        return cache.add(self.key, self.token, timeout=self.ttl)
+
+    def _run_script(self, script, *args):
+        """Выполняет Lua-скрипт над ключом аренды или None без Redis."""
+        try:
+            connection = get_redis_connection("default")
+        except NotImplementedError:
+            return None
+        return connection.register_script(script)(
+            keys=[cache.client.make_key(self.key)],
+            # Значения django_redis хранит сериализованными
+            args=[cache.client.encode(self.token), *args],
+        )
+
+    def renew(self):
+        renewed = self._run_script(RENEW_SCRIPT, self.ttl)
+        if renewed is not None:
+            return bool(renewed)
+        # Кэш без Redis (тесты): неатомарная проверка
+        if cache.get(self.key) != self.token:
+            return False
+        return cache.touch(self.key, self.ttl)
+
+    def release(self):
+        if self._run_script(RELEASE_SCRIPT) is not None:
+            return
+        if cache.get(self.key) == self.token:
+            cache.delete(self.key)
+
+    @contextmanager
+    def heartbeat(self):
+        """Продлевает аренду в фоне, пока выполняется блок."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.ttl / 3):
+                if not self.renew():
+                    break
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            yield self
+        finally:
+            stop.set()
+            thread.join()
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from consultations.list_cache import invalidate_list_cache
+from consultations.models import Consultation
+from consultations.search import refresh_search_text
+
+
+class Command(BaseCommand):
+    help = "Заполняет поисковую колонку search_text у всех консультаций"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, batch_size, **options):
+        updated = refresh_search_text(Consultation.objects.all(), batch_size)
+        if updated:
+            invalidate_list_cache()
+        self.stdout.write(f"Обновлено консультаций: {updated}")
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from consultations.benchmarks import measure, seeded_consultations
+from consultations.serializers import ConsultationSerializer
+from consultations.views import ConsultationViewSet
+from service.renderers import ORJSONCamelCaseRenderer
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность CamelCaseJSONRenderer и "
+        "ORJSONCamelCaseRenderer на больших списках консультаций"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=10)
+
+    def handle(self, *args, rows, repeat, **options):
+        request = APIRequestFactory().get("/users/consultations/")
+        request.user = User(role=User.ADMIN)
+        view = ConsultationViewSet(request=request)
+
+        with seeded_consultations(rows):
+            data = ConsultationSerializer(
+                view.get_queryset().order_by("start_date", "id"), many=True
+            ).data
+
+        results = {}
+        for renderer_class in (CamelCaseJSONRenderer, ORJSONCamelCaseRenderer):
+            renderer = renderer_class()
+            results[renderer_class] = renderer.render(data)
+            best, median = measure(lambda: renderer.render(data), repeat)
+            self.stdout.write(
+                f"{renderer_class.__name__:<24} строк={len(data)} "
+                f"best={best:.2f}ms median={median:.2f}ms "
+                f"строк/с={len(data) / best * 1000:.0f}"
+            )
+
+        if len(set(results.values())) != 1:
+            self.stderr.write("Вывод рендереров отличается")
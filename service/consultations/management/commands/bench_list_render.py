@@ -0,0 +1,51 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.test import RequestFactory
+
+from consultations.benchmarks import measure, seeded_consultations
+from consultations.models import Consultation
+from consultations.rows import project_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет отрисовку списка консультаций (20 строк и блок ближайших) "
+        "без кэша фрагментов и с прогретым кэшем строк"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, rows, repeat, **options):
+        request = RequestFactory().get("/consultations/")
+        request.user = AnonymousUser()
+        template = get_template("consultations/list.html")
+
+        with seeded_consultations(rows):
+            # Те же строки-проекции, что отдает шаблону представление
+            base = Consultation.objects.order_by("start_date")
+            object_list = list(project_rows(base.filter(patient__isnull=True))[:20])
+            upcoming_list = list(
+                project_rows(base.filter(patient__isnull=False))[:20]
+            )
+            for row in (*object_list, *upcoming_list):
+                row.can_edit = True
+
+            context = {
+                "object_list": object_list,
+                "upcoming_list": upcoming_list,
+                "upcoming_title": "Ближайшие консультации",
+                "is_admin": True,
+            }
+            # Таймаут 0 выключает кэш фрагментов: строка рисуется каждый раз
+            for name, timeout in (("без кэша", 0), ("кэш строк", 600)):
+                page_context = {**context, "row_cache_timeout": timeout}
+                template.render(page_context, request)
+                best, median = measure(
+                    lambda: template.render(page_context, request), repeat
+                )
+                self.stdout.write(
+                    f"{name:<10} best={best:.2f}ms median={median:.2f}ms"
+                )
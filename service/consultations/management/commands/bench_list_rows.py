@@ -0,0 +1,49 @@
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from consultations.benchmarks import measure, seeded_consultations
+from consultations.models import Consultation
+from consultations.rows import project_rows
+
+
+def models_path(free, booked):
+    # Прежний путь: полные модели консультаций, клиник, врачей, пациентов
+    # и их пользователей
+    related = ("clinic", "doctor", "doctor__user", "patient", "patient__user")
+    return list(free.select_related(*related)[:20]) + list(
+        booked.select_related(*related)[:20]
+    )
+
+
+def rows_path(free, booked):
+    return list(project_rows(free)[:20]) + list(project_rows(booked)[:20])
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает время и память на страницу списка консультаций "
+        "для полных моделей и облегченной проекции строк"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, rows, repeat, **options):
+        with seeded_consultations(rows):
+            base = Consultation.objects.order_by("start_date")
+            free = base.filter(patient__isnull=True)
+            booked = base.filter(patient__isnull=False)
+            for name, load in (("модели", models_path), ("проекция", rows_path)):
+                best, median = measure(lambda: load(free, booked), repeat)
+
+                tracemalloc.start()
+                page = load(free, booked)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                self.stdout.write(
+                    f"{name:<9} строк={len(page)} best={best:.2f}ms "
+                    f"median={median:.2f}ms peak={peak / 1024:.0f}KiB"
+                )
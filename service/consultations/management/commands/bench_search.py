@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from consultations.benchmarks import measure, seeded_consultations
+from consultations.models import Consultation
+from consultations.search import filter_by_person_name, search_tokens
+
+
+def legacy_filter(queryset, q):
+    # Прежний поиск: шесть icontains по соединенным таблицам пользователей
+    for token in search_tokens(q):
+        queryset = queryset.filter(
+            Q(doctor__user__first_name__icontains=token)
+            | Q(doctor__user__middle_name__icontains=token)
+            | Q(doctor__user__last_name__icontains=token)
+            | Q(patient__user__first_name__icontains=token)
+            | Q(patient__user__middle_name__icontains=token)
+            | Q(patient__user__last_name__icontains=token)
+        )
+    return queryset
+
+
+class Command(BaseCommand):
+    help = "Сравнивает прежний поиск консультаций по ФИО и поиск по search_text"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--query", action="append", dest="queries")
+        parser.add_argument("--explain", action="store_true")
+
+    def handle(self, *args, rows, repeat, queries, explain, **options):
+        queries = queries or ["Иван", "Петрова Анна", "Смирнов12"]
+        with seeded_consultations(rows):
+            base = Consultation.objects.select_related(
+                "clinic", "doctor", "doctor__user", "patient", "patient__user"
+            ).order_by("start_date")
+            for q in queries:
+                for name, search in (
+                    ("legacy", legacy_filter),
+                    ("search", filter_by_person_name),
+                ):
+                    for scope, queryset in (
+                        ("free", base.filter(patient__isnull=True)),
+                        ("booked", base.filter(patient__isnull=False)),
+                    ):
+                        page = search(queryset, q)[:20]
+                        best, median = measure(lambda: list(page.all()), repeat)
+                        self.stdout.write(
+                            f"{q!r:<18} {name:<8} {scope:<7} "
+                            f"best={best:.1f}ms median={median:.1f}ms"
+                        )
+                        if explain and connection.vendor == "postgresql":
+                            self.stdout.write(page.explain(analyze=True))
@@ -0,0 +1,35 @@
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from consultations.models import ScheduleTemplate
+from consultations.schedules import generate_slots
+
+
+class Command(BaseCommand):
+    help = "Создает свободные консультации по шаблонам расписания врачей"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", type=date.fromisoformat, help="Первая дата (YYYY-MM-DD)"
+        )
+        parser.add_argument(
+            "--days", type=int, default=settings.CONSULTATIONS_SLOT_GENERATION_DAYS
+        )
+        parser.add_argument("--clinic", type=int, help="ID клиники")
+        parser.add_argument("--doctor", type=int, help="ID врача")
+
+    def handle(self, *args, start, days, clinic, doctor, **options):
+        if start is None:
+            start = timezone.localdate()
+
+        templates = ScheduleTemplate.objects.all()
+        if clinic is not None:
+            templates = templates.filter(clinic_id=clinic)
+        if doctor is not None:
+            templates = templates.filter(doctor_id=doctor)
+
+        created = generate_slots(start, start + timedelta(days=days - 1), templates)
+        self.stdout.write(f"Создано слотов: {created}")
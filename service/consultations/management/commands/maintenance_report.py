@@ -0,0 +1,40 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django_celery_results.models import TaskResult
+
+MAINTENANCE_TASKS = (
+    "consultations.tasks.check_consultations",
+    "consultations.tasks.merge_maintenance_results",
+)
+
+
+class Command(BaseCommand):
+    help = "Показывает метрики фаз последних запусков обслуживания консультаций"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20)
+
+    def handle(self, *args, limit, **options):
+        task_results = TaskResult.objects.filter(
+            task_name__in=MAINTENANCE_TASKS, status="SUCCESS"
+        ).order_by("-date_done")[:limit]
+
+        for task_result in task_results:
+            try:
+                result = json.loads(task_result.result or "null")
+            except ValueError:
+                continue
+            if not isinstance(result, dict) or "phases" not in result:
+                continue
+
+            for name, metrics in result["phases"].items():
+                self.stdout.write(
+                    f"{task_result.date_done:%Y-%m-%d %H:%M:%S} {name:<30} "
+                    f"wall={metrics['wall_time']:.3f}s "
+                    f"cpu={metrics.get('cpu_time', 0):.3f}s "
+                    f"db={metrics['db_time']:.3f}s "
+                    f"queries={metrics['queries']} "
+                    f"scanned={metrics['rows_scanned']} "
+                    f"changed={metrics['rows_changed']}"
+                )
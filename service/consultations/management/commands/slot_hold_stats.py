@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from consultations.booking import SlotHold
+
+
+class Command(BaseCommand):
+    help = "Показывает количество конфликтов удержания слотов при записи"
+
+    def add_arguments(self, parser):
+        parser.add_argument("consultations", nargs="*", type=int, help="ID слотов")
+
+    def handle(self, *args, consultations, **options):
+        self.stdout.write(f"Всего конфликтов: {SlotHold.contention()}")
+        for consultation_id in consultations:
+            self.stdout.write(
+                f"Слот {consultation_id}: {SlotHold.contention(consultation_id)}"
+            )
@@ -0,0 +1,75 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+
+from django.db import connection
+
+from service.db import QueryStats
+
+logger = logging.getLogger("consultations.maintenance")
+
+_current_phase = ContextVar("maintenance_phase", default=None)
+
+
+@dataclass
+class PhaseMetrics:
+    name: str
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    db_time: float = 0.0
+    queries: int = 0
+    rows_scanned: int = 0
+    rows_changed: int = 0
+
+
+def measuring():
+    """Измеряется ли сейчас фаза обслуживания."""
+    return _current_phase.get() is not None
+
+
+def record_rows(scanned=0, changed=0):
+    """Учитывает строки в текущей фазе обслуживания, если она измеряется."""
+    phase = _current_phase.get()
+    if phase is not None:
+        phase.rows_scanned += scanned
+        phase.rows_changed += changed
+
+
+@contextmanager
+def track_phase(name, report):
+    """
+    Измеряет фазу обслуживания: время выполнения, процессорное время
+    воркера, время и количество запросов в БД, а также строки, учтенные
+    через record_rows(). Результат пишется в лог и добавляется в report.
+    """
+    phase = PhaseMetrics(name=name)
+    stats = QueryStats()
+    token = _current_phase.set(phase)
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    try:
+        with connection.execute_wrapper(stats):
+            yield phase
+    finally:
+        _current_phase.reset(token)
+        phase.wall_time = round(time.perf_counter() - started, 6)
+        phase.cpu_time = round(time.process_time() - cpu_started, 6)
+        phase.db_time = round(stats.duration, 6)
+        phase.queries = stats.count
+        metrics = asdict(phase)
+        del metrics["name"]
+        report[name] = metrics
+        logger.info(
+            "phase=%s wall_time=%.3fs cpu_time=%.3fs db_time=%.3fs queries=%d "
+            "rows_scanned=%d rows_changed=%d",
+            name,
+            phase.wall_time,
+            phase.cpu_time,
+            phase.db_time,
+            phase.queries,
+            phase.rows_scanned,
+            phase.rows_changed,
+            extra={"maintenance_phase": name, "metrics": metrics},
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0005_consultation_created_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='consultation',
+            name='end_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='consultation',
+            name='start_date',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
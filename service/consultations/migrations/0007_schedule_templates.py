@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0006_consultation_dates_indexes'),
+        ('users', '0004_alter_user_managers_alter_user_password'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Понедельник'), (1, 'Вторник'), (2, 'Среда'), (3, 'Четверг'), (4, 'Пятница'), (5, 'Суббота'), (6, 'Воскресенье')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('slot_duration', models.PositiveSmallIntegerField(default=30)),
+                ('clinic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='consultations.clinic')),
+                ('doctor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.doctor')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScheduleBreak',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='breaks', to='consultations.scheduletemplate')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='scheduletemplate',
+            constraint=models.UniqueConstraint(fields=('clinic', 'doctor', 'weekday'), name='unique_schedule_template'),
+        ),
+    ]
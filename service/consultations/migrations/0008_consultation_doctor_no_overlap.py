@@ -0,0 +1,89 @@
+"""
+Ограничение "консультации врача не пересекаются" на PostgreSQL.
+
+Предусловие: в таблице нет пересекающихся консультаций одного врача
+и консультаций с окончанием раньше начала. Иначе ALTER TABLE падает,
+поэтому перед ним check_existing_rows выводит конфликтующие строки,
+которые нужно перенести или удалить вручную.
+"""
+
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations
+
+OVERLAPS_SQL = """
+SELECT a.doctor_id, a.id, b.id
+FROM consultations_consultation a
+JOIN consultations_consultation b
+    ON a.doctor_id = b.doctor_id
+    AND a.id < b.id
+    AND a.start_date < b.end_date
+    AND b.start_date < a.end_date
+ORDER BY a.doctor_id, a.id
+LIMIT 20
+"""
+
+INVERTED_SQL = """
+SELECT id FROM consultations_consultation
+WHERE end_date < start_date
+ORDER BY id
+LIMIT 20
+"""
+
+CONSTRAINT_SQL = """
+ALTER TABLE consultations_consultation
+ADD CONSTRAINT consultation_doctor_no_overlap
+EXCLUDE USING gist (
+    doctor_id WITH =,
+    tstzrange(start_date, end_date, '[)') WITH &&
+)
+"""
+
+DROP_CONSTRAINT_SQL = """
+ALTER TABLE consultations_consultation
+DROP CONSTRAINT IF EXISTS consultation_doctor_no_overlap
+"""
+
+
+def check_existing_rows(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(OVERLAPS_SQL)
+        overlaps = cursor.fetchall()
+        cursor.execute(INVERTED_SQL)
+        inverted = [row[0] for row in cursor.fetchall()]
+    if not overlaps and not inverted:
+        return
+
+    lines = ["Нельзя добавить consultation_doctor_no_overlap:"]
+    lines += [
+        f"  врач {doctor_id}: консультации {first} и {second} пересекаются"
+        for doctor_id, first, second in overlaps
+    ]
+    if inverted:
+        lines.append(f"  окончание раньше начала: {inverted}")
+    lines.append("Исправьте эти консультации и повторите migrate (до 20 строк).")
+    raise RuntimeError("\n".join(lines))
+
+
+def add_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(CONSTRAINT_SQL)
+
+
+def drop_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DROP_CONSTRAINT_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("consultations", "0007_schedule_templates"),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.RunPython(check_existing_rows, migrations.RunPython.noop),
+        migrations.RunPython(add_constraint, drop_constraint),
+    ]
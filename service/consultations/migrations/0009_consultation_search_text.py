@@ -0,0 +1,71 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:47
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from consultations.search import normalize_search_text
+
+NAME_FIELDS = ("first_name", "middle_name", "last_name")
+BATCH_SIZE = 1000
+
+
+def fill_search_text(apps, schema_editor):
+    # Без заполнения поиск по ФИО не находил бы существующие консультации.
+    # У исторических моделей нет User.__str__, поэтому ФИО собирается
+    # из полей в том же порядке
+    Consultation = apps.get_model("consultations", "Consultation")
+    rows = (
+        Consultation.objects.order_by("pk")
+        .values_list(
+            "pk",
+            *(f"doctor__user__{field}" for field in NAME_FIELDS),
+            *(f"patient__user__{field}" for field in NAME_FIELDS),
+        )
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    pending = []
+    for pk, *names in rows:
+        pending.append(
+            Consultation(
+                pk=pk,
+                search_text=normalize_search_text(
+                    " ".join(name for name in names if name is not None)
+                ),
+            )
+        )
+        if len(pending) >= BATCH_SIZE:
+            Consultation.objects.bulk_update(pending, ["search_text"])
+            pending = []
+    if pending:
+        Consultation.objects.bulk_update(pending, ["search_text"])
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS consultation_search_text_trgm "
+            "ON consultations_consultation USING gin (search_text gin_trgm_ops)"
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS consultation_search_text_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0008_consultation_doctor_no_overlap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultation',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        TrigramExtension(),
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0009_consultation_search_text'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(condition=models.Q(('patient__isnull', True)), fields=['start_date', 'id'], name='consultation_free_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(condition=models.Q(('patient__isnull', True)), fields=['created_at', 'id'], name='consultation_free_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(condition=models.Q(('patient__isnull', True)), fields=['status', 'start_date', 'id'], name='consultation_free_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(fields=['doctor', 'start_date'], name='consultation_doctor_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultation',
+            index=models.Index(condition=models.Q(('patient__isnull', False)), fields=['patient', 'start_date'], name='consultation_patient_start_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:56
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Now
+
+
+def fill_updated_at(apps, schema_editor):
+    Consultation = apps.get_model("consultations", "Consultation")
+    Consultation.objects.filter(updated_at__isnull=True).update(
+        updated_at=Coalesce("created_at", Now())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0010_consultation_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultation',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:15
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def fix_zero_durations(apps, schema_editor):
+    # Шаблоны с нулевой длительностью подвешивали генерацию слотов;
+    # до ограничения выставляем им длительность по умолчанию
+    ScheduleTemplate = apps.get_model("consultations", "ScheduleTemplate")
+    ScheduleTemplate.objects.filter(slot_duration=0).update(slot_duration=30)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consultations', '0011_consultation_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(fix_zero_durations, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='scheduletemplate',
+            name='slot_duration',
+            field=models.PositiveSmallIntegerField(default=30, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduletemplate',
+            constraint=models.CheckConstraint(condition=models.Q(('slot_duration__gt', 0)), name='schedule_template_slot_duration_positive'),
+        ),
+    ]
@@ -1,6 +1,11 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import Q
 
-from users.models import Doctor, Patient
+from consultations.list_cache import invalidate_list_cache
+from consultations.search import build_search_text
+from users.models import Doctor, Patient, User
 
 
 class Clinic(models.Model):
@@ -13,12 +18,20 @@ class Clinic(models.Model):
 
 
 class Consultation(models.Model):
+    # Ограничение исключения в PostgreSQL (см. миграцию 0008): у врача не может
+    # быть двух консультаций с пересекающимися интервалами [start_date, end_date)
+    DOCTOR_OVERLAP_CONSTRAINT = "consultation_doctor_no_overlap"
+    DOCTOR_OVERLAP_ERROR = "У врача уже есть консультация на это время."
+
     clinic = models.ForeignKey(Clinic, on_delete=models.CASCADE)
     doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE)
     patient = models.ForeignKey(
         Patient, on_delete=models.CASCADE, null=True, blank=True
     )
     created_at = models.DateTimeField(auto_now_add=True, db_index=True, null=True)
+    # Версия строки для кэша фрагментов списка; массовые UPDATE
+    # обходят auto_now и выставляют поле явно
+    updated_at = models.DateTimeField(auto_now=True, null=True)
 
     CONFIRMED = "подтверждена"
     PENDING = "ожидает"
@@ -39,5 +52,140 @@ class Consultation(models.Model):
         max_length=20, choices=STATUS_CHOICES, default=CREATED, blank=False
     )
 
-    start_date = models.DateTimeField(blank=False)
-    end_date = models.DateTimeField(blank=False)
+    start_date = models.DateTimeField(blank=False, db_index=True)
+    end_date = models.DateTimeField(blank=False, db_index=True)
+
+    class Meta:
+        # Индексы под режимы сортировки и фильтры списка консультаций:
+        # частичные для свободных слотов (patient IS NULL) и составные
+        # для блоков ближайших консультаций врача и пациента
+        indexes = [
+            models.Index(
+                fields=["start_date", "id"],
+                condition=Q(patient__isnull=True),
+                name="consultation_free_start_idx",
+            ),
+            models.Index(
+                fields=["created_at", "id"],
+                condition=Q(patient__isnull=True),
+                name="consultation_free_created_idx",
+            ),
+            models.Index(
+                fields=["status", "start_date", "id"],
+                condition=Q(patient__isnull=True),
+                name="consultation_free_status_idx",
+            ),
+            models.Index(
+                fields=["doctor", "start_date"],
+                name="consultation_doctor_start_idx",
+            ),
+            models.Index(
+                fields=["patient", "start_date"],
+                condition=Q(patient__isnull=False),
+                name="consultation_patient_start_idx",
+            ),
+        ]
+
+    # ФИО врача и пациента в нижнем регистре с заменой ё на е для поиска
+    # без соединений; поддерживается в save() и сигналах consultations.signals
+    search_text = models.TextField(blank=True, default="", editable=False)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or {"doctor", "patient"} & set(update_fields):
+            self.search_text = self.build_search_text()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "search_text"}
+        super().save(*args, **kwargs)
+        invalidate_list_cache()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_list_cache()
+        return result
+
+    def build_search_text(self):
+        users = []
+        missing = Q()
+        for name in ("doctor", "patient"):
+            field = self._meta.get_field(name)
+            profile_id = getattr(self, field.attname)
+            if profile_id is None:
+                continue
+            profile = getattr(self, name) if field.is_cached(self) else None
+            if profile is not None and profile._meta.get_field("user").is_cached(
+                profile
+            ):
+                users.append(profile.user)
+            else:
+                missing |= Q(**{f"{name}__pk": profile_id})
+        if missing:
+            users.extend(User.objects.filter(missing))
+        return build_search_text(*users)
+
+    @classmethod
+    def is_doctor_overlap(cls, error):
+        return cls.DOCTOR_OVERLAP_CONSTRAINT in str(error)
+
+
+class ScheduleTemplate(models.Model):
+    """Рабочие часы врача в клинике на день недели."""
+
+    WEEKDAY_CHOICES = [
+        (0, "Понедельник"),
+        (1, "Вторник"),
+        (2, "Среда"),
+        (3, "Четверг"),
+        (4, "Пятница"),
+        (5, "Суббота"),
+        (6, "Воскресенье"),
+    ]
+
+    clinic = models.ForeignKey(Clinic, on_delete=models.CASCADE)
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE)
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_duration = models.PositiveSmallIntegerField(
+        default=30, validators=[MinValueValidator(1)]
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["clinic", "doctor", "weekday"],
+                name="unique_schedule_template",
+            ),
+            models.CheckConstraint(
+                condition=Q(slot_duration__gt=0),
+                name="schedule_template_slot_duration_positive",
+            ),
+        ]
+
+    def clean(self):
+        super().clean()
+        if (
+            self.start_time is not None
+            and self.end_time is not None
+            and self.end_time <= self.start_time
+        ):
+            raise ValidationError(
+                {"end_time": "Окончание работы должно быть позже начала."}
+            )
+
+    def __str__(self):
+        return (
+            f"{self.doctor}: {self.get_weekday_display()} "
+            f"{self.start_time:%H:%M}-{self.end_time:%H:%M}"
+        )
+
+
+class ScheduleBreak(models.Model):
+    template = models.ForeignKey(
+        ScheduleTemplate, on_delete=models.CASCADE, related_name="breaks"
+    )
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    def __str__(self):
+        return f"{self.start_time:%H:%M}-{self.end_time:%H:%M}"
@@ -0,0 +1,128 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination
+
+
+@dataclass
+class CursorPage:
+    object_list: list
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+class CursorPaginator:
+    """
+    Постраничная навигация по ключу сортировки (keyset) вместо OFFSET.
+    Страница выбирается условием "после/до значений ключа последней строки",
+    поэтому ее стоимость не зависит от глубины, а COUNT(*) не нужен.
+    К сортировке всегда добавляется pk, чтобы ключ был уникальным.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = [name for name in ordering if name.lstrip("-") != "pk"]
+        descending = bool(ordering) and ordering[-1].startswith("-")
+        self.ordering.append("-pk" if descending else "pk")
+
+    def _field(self, name):
+        name = name.lstrip("-")
+        meta = self.queryset.model._meta
+        return meta.pk if name == "pk" else meta.get_field(name)
+
+    def _encode(self, obj, direction):
+        values = []
+        for name in self.ordering:
+            value = getattr(obj, self._field(name).attname)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            values.append(value)
+        payload = json.dumps({"d": direction, "v": values}).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    def _decode(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            direction, values = payload["d"], payload["v"]
+            if direction not in ("next", "prev") or len(values) != len(
+                self.ordering
+            ):
+                return None
+            # clean() кроме типа проверяет null, choices и диапазон чисел
+            return direction, [
+                self._field(name).clean(value, None)
+                for name, value in zip(self.ordering, values)
+            ]
+        except (
+            ValueError,
+            TypeError,
+            KeyError,
+            AttributeError,
+            OverflowError,
+            ValidationError,
+        ):
+            # Подделанный или поврежденный курсор: отдаем первую страницу
+            return None
+
+    def _after(self, values, reverse):
+        condition = Q()
+        equal = {}
+        for name, value in zip(self.ordering, values):
+            attname = name.lstrip("-")
+            descending = name.startswith("-") != reverse
+            lookup = f"{attname}__lt" if descending else f"{attname}__gt"
+            condition |= Q(**equal, **{lookup: value})
+            equal[attname] = value
+        return condition
+
+    def page(self, cursor=None):
+        decoded = self._decode(cursor) if cursor else None
+        queryset = self.queryset
+        ordering = self.ordering
+        reverse = False
+        if decoded is not None:
+            direction, values = decoded
+            reverse = direction == "prev"
+            queryset = queryset.filter(self._after(values, reverse))
+            if reverse:
+                ordering = [
+                    name[1:] if name.startswith("-") else f"-{name}"
+                    for name in ordering
+                ]
+
+        rows = list(queryset.order_by(*ordering)[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, decoded is not None
+
+        if not rows:
+            return CursorPage(object_list=[])
+        return CursorPage(
+            object_list=rows,
+            next_cursor=self._encode(rows[-1], "next") if has_next else None,
+            previous_cursor=self._encode(rows[0], "prev") if has_previous else None,
+        )
+
+
+class ConsultationCursorPagination(CursorPagination):
+    """Курсорная пагинация API консультаций по началу приема."""
+
+    ordering = ("start_date", "id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
@@ -0,0 +1,60 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.db.models import F
+from django.db.models.query import ValuesIterable
+
+
+@dataclass
+class ConsultationRow:
+    """
+    Строка списка консультаций: только колонки, которые выводит шаблон,
+    без моделей клиники, врача, пациента и их пользователей.
+    """
+
+    id: int
+    clinic_name: str
+    doctor_user_id: int
+    doctor_last_name: str
+    doctor_first_name: str
+    patient_id: int | None
+    patient_last_name: str | None
+    patient_first_name: str | None
+    status: str
+    start_date: datetime
+    end_date: datetime
+    updated_at: datetime | None
+    can_edit: bool = False
+
+    @property
+    def pk(self):
+        return self.id
+
+
+class ConsultationRowIterable(ValuesIterable):
+    def __iter__(self):
+        for values in super().__iter__():
+            yield ConsultationRow(**values)
+
+
+def project_rows(queryset):
+    """
+    Проекция queryset консультаций в ConsultationRow одним запросом по
+    нужным колонкам. Фильтрация, сортировка и срезы работают как обычно.
+    """
+    queryset = queryset.values(
+        "id",
+        "status",
+        "start_date",
+        "end_date",
+        "updated_at",
+        "patient_id",
+        clinic_name=F("clinic__name"),
+        doctor_user_id=F("doctor__user_id"),
+        doctor_last_name=F("doctor__user__last_name"),
+        doctor_first_name=F("doctor__user__first_name"),
+        patient_last_name=F("patient__user__last_name"),
+        patient_first_name=F("patient__user__first_name"),
+    )
+    queryset._iterable_class = ConsultationRowIterable
+    return queryset
@@ -0,0 +1,107 @@
+"""
+Планировщик смены статусов консультаций через отложенные задачи Celery.
+
+Время разбито на корзины: тик планирует только переходы из еще не
+обработанных корзин ближайшего горизонта, а не обходит всю таблицу.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from consultations.models import Consultation
+
+# Переход в "завершена" требует end_date < now, поэтому задача
+# запускается чуть позже окончания консультации.
+END_MARGIN = timedelta(seconds=1)
+
+BUCKET_KEY = "consultations:scheduler:bucket:{}"
+
+
+def _bucket_seconds():
+    return int(settings.CONSULTATIONS_SCHEDULER_BUCKET.total_seconds())
+
+
+def bucket_of(moment):
+    return int(moment.timestamp()) // _bucket_seconds()
+
+
+def bucket_bounds(bucket):
+    size = _bucket_seconds()
+    start = datetime.fromtimestamp(bucket * size, tz=dt_timezone.utc)
+    return start, start + timedelta(seconds=size)
+
+
+def _horizon_bucket(now):
+    return bucket_of(now + settings.CONSULTATIONS_SCHEDULER_HORIZON)
+
+
+def _enqueue(consultation_id, eta):
+    from consultations.tasks import apply_status_transition
+
+    transaction.on_commit(
+        lambda: apply_status_transition.apply_async((consultation_id,), eta=eta)
+    )
+
+
+def schedule_status_transitions(consultation, now=None):
+    """
+    Планирует переходы консультации, попавшие в горизонт планировщика.
+    Более поздние переходы подберет тик планировщика.
+    """
+    if now is None:
+        now = timezone.now()
+
+    horizon = _horizon_bucket(now)
+    scheduled = 0
+    for eta in (consultation.start_date, consultation.end_date + END_MARGIN):
+        if bucket_of(eta) <= horizon:
+            _enqueue(consultation.pk, eta)
+            scheduled += 1
+    return scheduled
+
+
+def plan_due_buckets(now=None):
+    """
+    Планирует переходы для всех еще не обработанных корзин от текущей
+    до конца горизонта. Возвращает количество поставленных задач.
+    """
+    if now is None:
+        now = timezone.now()
+
+    marker_ttl = int(
+        (
+            settings.CONSULTATIONS_SCHEDULER_HORIZON
+            + 2 * settings.CONSULTATIONS_SCHEDULER_BUCKET
+        ).total_seconds()
+    )
+    scheduled = 0
+    for bucket in range(bucket_of(now), _horizon_bucket(now) + 1):
+        if not cache.add(BUCKET_KEY.format(bucket), 1, timeout=marker_ttl):
+            continue
+
+        start, end = bucket_bounds(bucket)
+        starting = (
+            Consultation.objects.filter(start_date__gte=start, start_date__lt=end)
+            .exclude(status=Consultation.STARTED)
+            .values_list("pk", "start_date")
+        )
+        for pk, start_date in starting:
+            _enqueue(pk, start_date)
+            scheduled += 1
+
+        ending = (
+            Consultation.objects.filter(
+                end_date__gte=start - END_MARGIN, end_date__lt=end - END_MARGIN
+            )
+            .exclude(status=Consultation.COMPLETED)
+            .values_list("pk", "end_date")
+        )
+        for pk, end_date in ending:
+            _enqueue(pk, end_date + END_MARGIN)
+            scheduled += 1
+
+    return scheduled
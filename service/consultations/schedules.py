@@ -0,0 +1,128 @@
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from consultations.list_cache import invalidate_list_cache
+from consultations.models import Consultation, ScheduleTemplate
+from consultations.scheduler import schedule_status_transitions
+from consultations.search import build_search_text
+
+
+def template_slots(template, day):
+    """Слоты шаблона на указанную дату без учета уже созданных консультаций."""
+    tz = timezone.get_current_timezone()
+    duration = timedelta(minutes=template.slot_duration)
+    if duration <= timedelta(0):
+        # Иначе цикл ниже не продвигается и не завершается
+        return
+    day_end = timezone.make_aware(datetime.combine(day, template.end_time), tz)
+    breaks = [
+        (
+            timezone.make_aware(datetime.combine(day, item.start_time), tz),
+            timezone.make_aware(datetime.combine(day, item.end_time), tz),
+        )
+        for item in template.breaks.all()
+    ]
+
+    start = timezone.make_aware(datetime.combine(day, template.start_time), tz)
+    while start + duration <= day_end:
+        end = start + duration
+        overlapping = [
+            b_end for b_start, b_end in breaks if start < b_end and b_start < end
+        ]
+        if overlapping:
+            # Следующий слот начинается сразу после перерыва
+            start = max(overlapping)
+            continue
+        yield start, end
+        start = end
+
+
+def _overlaps(intervals, start, end):
+    # Консультации врача не пересекаются, поэтому концы интервалов
+    # упорядочены так же, как начала, и достаточно проверить соседей
+    index = bisect_left(intervals, (start, end))
+    if index > 0 and intervals[index - 1][1] > start:
+        return True
+    return index < len(intervals) and intervals[index][0] < end
+
+
+def _create_slots(slots, now):
+    Consultation.objects.bulk_create(slots)
+    # Корзины горизонта могли быть уже спланированы тиком, и до полного
+    # обхода статусов он эти слоты не подберет
+    for slot in slots:
+        schedule_status_transitions(slot, now=now)
+    return len(slots)
+
+
+def generate_slots(date_from, date_to, templates=None, batch_size=None, now=None):
+    """
+    Создает свободные консультации по шаблонам расписания на даты
+    [date_from, date_to] через bulk_create пачками по batch_size.
+    Слоты в прошлом и слоты, пересекающиеся с уже существующими
+    консультациями врача, пропускаются. Возвращает количество созданных слотов.
+    """
+    if templates is None:
+        templates = ScheduleTemplate.objects.all()
+    if batch_size is None:
+        batch_size = settings.CONSULTATIONS_SLOT_BATCH_SIZE
+    if now is None:
+        now = timezone.now()
+
+    templates = templates.select_related("doctor__user").prefetch_related("breaks")
+    by_doctor = {}
+    for template in templates:
+        by_doctor.setdefault(template.doctor_id, []).append(template)
+
+    days = [
+        date_from + timedelta(days=offset)
+        for offset in range((date_to - date_from).days + 1)
+    ]
+    range_start = timezone.make_aware(
+        datetime.combine(date_from, datetime.min.time()),
+        timezone.get_current_timezone(),
+    )
+    range_end = range_start + timedelta(days=len(days))
+
+    created = 0
+    pending = []
+    for doctor_id, doctor_templates in by_doctor.items():
+        existing = sorted(
+            Consultation.objects.filter(
+                doctor_id=doctor_id,
+                start_date__lt=range_end,
+                end_date__gt=range_start,
+            ).values_list("start_date", "end_date")
+        )
+        search_text = build_search_text(doctor_templates[0].doctor.user)
+        for template in doctor_templates:
+            for day in days:
+                if day.weekday() != template.weekday:
+                    continue
+                for start, end in template_slots(template, day):
+                    if start <= now or _overlaps(existing, start, end):
+                        continue
+                    insort(existing, (start, end))
+                    pending.append(
+                        Consultation(
+                            clinic_id=template.clinic_id,
+                            doctor_id=doctor_id,
+                            status=Consultation.CREATED,
+                            start_date=start,
+                            end_date=end,
+                            search_text=search_text,
+                        )
+                    )
+                    if len(pending) >= batch_size:
+                        created += _create_slots(pending, now)
+                        pending = []
+
+    if pending:
+        created += _create_slots(pending, now)
+
+    if created:
+        invalidate_list_cache()
+    return created
@@ -0,0 +1,60 @@
+import re
+
+from django.utils import timezone
+
+
+def normalize_search_text(text):
+    return " ".join(text.lower().replace("ё", "е").split())
+
+
+def search_tokens(q):
+    return [
+        normalize_search_text(token) for token in re.split(r"\s+", q.strip()) if token
+    ]
+
+
+def build_search_text(*users):
+    return normalize_search_text(" ".join(str(user) for user in users if user))
+
+
+def filter_by_person_name(queryset, q):
+    """
+    Оставляет консультации, у которых каждый токен запроса встречается
+    в ФИО врача или пациента. Поиск идет по нормализованной колонке
+    search_text без соединений; на PostgreSQL ее обслуживает GIN-индекс
+    pg_trgm из миграции 0009.
+    """
+    for token in search_tokens(q):
+        queryset = queryset.filter(search_text__contains=token)
+    return queryset
+
+
+def refresh_search_text(queryset, batch_size=1000):
+    """Пересчитывает search_text у консультаций queryset пачками."""
+    consultations = (
+        queryset.select_related("doctor__user", "patient__user")
+        .order_by("pk")
+        .iterator(chunk_size=batch_size)
+    )
+    now = timezone.now()
+    updated = 0
+    pending = []
+    for consultation in consultations:
+        search_text = build_search_text(
+            consultation.doctor.user,
+            consultation.patient.user if consultation.patient else None,
+        )
+        if search_text == consultation.search_text:
+            continue
+        consultation.search_text = search_text
+        consultation.updated_at = now
+        pending.append(consultation)
+        if len(pending) >= batch_size:
+            queryset.model.objects.bulk_update(pending, ["search_text", "updated_at"])
+            updated += len(pending)
+            pending = []
+
+    if pending:
+        queryset.model.objects.bulk_update(pending, ["search_text", "updated_at"])
+        updated += len(pending)
+    return updated
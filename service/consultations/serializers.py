@@ -0,0 +1,64 @@
+from rest_framework import serializers
+
+from consultations.bulk import CREATE, DELETE, UPDATE
+from consultations.models import Consultation
+
+
+class ConsultationSerializer(serializers.Serializer):
+    """
+    Плоское представление консультации: читает строки values() без
+    вложенных сериализаторов клиники, врача и пациента.
+    """
+
+    id = serializers.IntegerField(read_only=True)
+    status = serializers.CharField(read_only=True)
+    start_date = serializers.DateTimeField(read_only=True)
+    end_date = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+    clinic_id = serializers.IntegerField(read_only=True)
+    clinic_name = serializers.CharField(read_only=True)
+    doctor_id = serializers.IntegerField(read_only=True)
+    doctor_name = serializers.CharField(read_only=True)
+    patient_id = serializers.IntegerField(read_only=True, allow_null=True)
+    patient_name = serializers.CharField(read_only=True, allow_null=True)
+
+
+class ConsultationFilterSerializer(serializers.Serializer):
+    """Параметры фильтрации списка консультаций API."""
+
+    status = serializers.CharField(required=False)
+    doctor = serializers.IntegerField(required=False)
+    clinic = serializers.IntegerField(required=False)
+    date_from = serializers.DateTimeField(required=False)
+    date_to = serializers.DateTimeField(required=False)
+
+    def validate_status(self, value):
+        return [status.strip() for status in value.split(",") if status.strip()]
+
+
+class ConsultationOperationSerializer(serializers.Serializer):
+    """Одна операция пакетного изменения консультаций."""
+
+    op = serializers.ChoiceField(choices=[CREATE, UPDATE, DELETE])
+    id = serializers.IntegerField(required=False)
+    clinic = serializers.IntegerField(required=False)
+    doctor = serializers.IntegerField(required=False)
+    patient = serializers.IntegerField(required=False, allow_null=True)
+    status = serializers.ChoiceField(
+        choices=Consultation.STATUS_CHOICES, required=False
+    )
+    start_date = serializers.DateTimeField(required=False)
+    end_date = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if data["op"] == CREATE:
+            missing = [name for name in ("clinic", "start_date") if name not in data]
+            if "id" in data:
+                raise serializers.ValidationError({"id": "Не задается при создании."})
+        else:
+            missing = [] if "id" in data else ["id"]
+        if missing:
+            raise serializers.ValidationError(
+                {name: "Обязательное поле." for name in missing}
+            )
+        return data
@@ -0,0 +1,86 @@
+from django.db.models import Q
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from consultations.choices import (
+    CLINIC_CHOICES_KEY,
+    DOCTOR_CHOICES_KEY,
+    forget_choices,
+)
+from consultations.list_cache import invalidate_list_cache
+from consultations.models import Clinic, Consultation
+from consultations.search import refresh_search_text
+from users.models import Doctor, Patient, User
+
+NAME_FIELDS = ("first_name", "middle_name", "last_name")
+
+
+@receiver(pre_save, sender=User)
+def remember_user_names(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._search_names_changed = False
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(NAME_FIELDS) & set(update_fields):
+        return
+    old_names = User.objects.filter(pk=instance.pk).values_list(*NAME_FIELDS).first()
+    instance._search_names_changed = old_names is not None and old_names != tuple(
+        getattr(instance, field) for field in NAME_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def refresh_user_consultations(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(instance, "_search_names_changed", False):
+        return
+    consultations = Consultation.objects.filter(
+        Q(doctor__user=instance) | Q(patient__user=instance)
+    )
+    refresh_search_text(consultations)
+    invalidate_list_cache()
+    if instance.role == User.DOCTOR:
+        forget_choices(DOCTOR_CHOICES_KEY)
+
+
+@receiver(post_save, sender=Doctor)
+def refresh_doctor_consultations(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        refresh_search_text(Consultation.objects.filter(doctor=instance))
+        invalidate_list_cache()
+
+
+@receiver(post_save, sender=Patient)
+def refresh_patient_consultations(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        refresh_search_text(Consultation.objects.filter(patient=instance))
+        invalidate_list_cache()
+
+
+@receiver(post_save, sender=Clinic)
+def invalidate_clinic_consultations(sender, instance, created, raw=False, **kwargs):
+    if not raw and not created:
+        # Название клиники выводится в строке списка: меняем версию строк
+        Consultation.objects.filter(clinic=instance).update(updated_at=Now())
+        invalidate_list_cache()
+
+
+# Каскадное удаление консультаций идет мимо Consultation.delete()
+@receiver(post_delete, sender=Clinic)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=Patient)
+def invalidate_deleted_consultations(sender, instance, **kwargs):
+    invalidate_list_cache()
+
+
+@receiver(post_save, sender=Clinic)
+@receiver(post_delete, sender=Clinic)
+def forget_clinic_choices(sender, raw=False, **kwargs):
+    if not raw:
+        forget_choices(CLINIC_CHOICES_KEY)
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+def forget_doctor_choices(sender, raw=False, **kwargs):
+    if not raw:
+        forget_choices(DOCTOR_CHOICES_KEY)
@@ -1,30 +1,232 @@
-from celery import shared_task
+import logging
+import time
+from datetime import datetime, timedelta
 
+from celery import chord, group, shared_task
+
+from consultations.list_cache import invalidate_list_cache
+from consultations.locks import Lease
+from consultations.metrics import measuring, record_rows, track_phase
 from consultations.models import Consultation
+from consultations.scheduler import plan_due_buckets
+from consultations.schedules import generate_slots
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.db.models.functions import Now
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
+
+def change_consultation_status(now=None, queryset=None):
+    """
+    Переводит консультации в статусы "завершена" и "начата".
+
+    Каждый переход выполняется одним UPDATE по множеству строк и затрагивает
+    только те консультации, статус которых действительно меняется.
+    Возвращает количество обновленных строк по каждому переходу.
+    """
+    if now is None:
+        now = timezone.now()
+    if queryset is None:
+        queryset = Consultation.objects.all()
+
+    scanned = 0
+    if measuring() and settings.CONSULTATIONS_MAINTENANCE_COUNT_SCANNED:
+        # Кандидаты обоих переходов по времени, в том числе уже в нужном
+        # статусе. UPDATE их не возвращает, а COUNT проходит почти всю
+        # таблицу, поэтому включается настройкой для разовых замеров
+        scanned = queryset.filter(start_date__lte=now).count()
+
+    completed = (
+        queryset.filter(end_date__lt=now)
+        .exclude(status=Consultation.COMPLETED)
+        .update(status=Consultation.COMPLETED, updated_at=Now())
+    )
+    started = (
+        queryset.filter(start_date__lte=now, end_date__gte=now)
+        .exclude(status=Consultation.STARTED)
+        .update(status=Consultation.STARTED, updated_at=Now())
+    )
+    record_rows(scanned=scanned, changed=completed + started)
+    if completed or started:
+        invalidate_list_cache()
+
+    return {"completed": completed, "started": started}
+
+
+def delete_expired_consultations(
+    now=None, batch_size=None, time_limit=None, queryset=None
+):
+    """
+    Удаляет просроченные несостоявшиеся консультации пачками.
 
-def change_consultation_status():
-    consultations = Consultation.objects.filter()
-    for consultation in consultations:
-        if consultation.end_date < timezone.now():
-            consultation.status = Consultation.COMPLETED
-            consultation.save()
+    Каждая пачка первичных ключей удаляется в отдельной короткой транзакции
+    через QuerySet.delete(), который сам учитывает каскадные связи. Обход
+    прекращается по исчерпании строк или лимита времени на запуск; остаток
+    удалит следующий запуск. Возвращает количество удаленных консультаций.
+    """
+    if now is None:
+        now = timezone.now()
+    if batch_size is None:
+        batch_size = settings.CONSULTATIONS_PURGE_BATCH_SIZE
+    if time_limit is None:
+        time_limit = settings.CONSULTATIONS_PURGE_TIME_LIMIT
+    if queryset is None:
+        queryset = Consultation.objects.all()
 
-        elif consultation.start_date <= timezone.now():
-            consultation.status = Consultation.STARTED
-            consultation.save()
+    deadline = time.monotonic() + time_limit.total_seconds()
+    expired = queryset.filter(status=Consultation.CREATED, start_date__lt=now)
+    deleted = 0
+    while True:
+        pks = list(expired.order_by("pk").values_list("pk", flat=True)[:batch_size])
+        if not pks:
+            break
 
+        with transaction.atomic():
+            _, per_model = expired.filter(pk__in=pks).delete()
+        batch_deleted = per_model.get(Consultation._meta.label, 0)
+        record_rows(scanned=len(pks), changed=batch_deleted)
+        deleted += batch_deleted
+        if batch_deleted:
+            invalidate_list_cache()
 
-def delete_expired_consultations():
-    consultations = Consultation.objects.filter(
-        status=Consultation.CREATED, start_date__lt=timezone.now()
+        if len(pks) < batch_size or time.monotonic() >= deadline:
+            break
+
+    return deleted
+
+
+def run_maintenance(now=None, queryset=None):
+    if now is None:
+        now = timezone.now()
+
+    phases = {}
+    with track_phase("change_consultation_status", phases):
+        result = change_consultation_status(now=now, queryset=queryset)
+    with track_phase("delete_expired_consultations", phases):
+        result["deleted"] = delete_expired_consultations(now=now, queryset=queryset)
+    result["phases"] = phases
+    return result
+
+
+def maintenance_shards():
+    """
+    Делит таблицу консультаций на диапазоны первичных ключей для
+    параллельного обслуживания. Количество диапазонов ограничено
+    CONSULTATIONS_MAINTENANCE_SHARDS и минимальным размером диапазона.
+    """
+    bounds = Consultation.objects.aggregate(low=Min("pk"), high=Max("pk"))
+    low, high = bounds["low"], bounds["high"]
+    if low is None:
+        return []
+
+    span = high - low + 1
+    count = max(
+        1,
+        min(
+            settings.CONSULTATIONS_MAINTENANCE_SHARDS,
+            span // settings.CONSULTATIONS_MAINTENANCE_MIN_SHARD_SIZE,
+        ),
     )
-    for consultation in consultations:
-        consultation.delete()
+    step = -(-span // count)
+    return [
+        (start, min(start + step - 1, high)) for start in range(low, high + 1, step)
+    ]
+
+
+# Шарды выполняются параллельно: время фазы равно самому долгому шарду,
+# а суммарная работа воркеров видна в cpu_time и db_time
+MAX_MERGED = {"wall_time"}
+
+
+def merge_results(results):
+    merged = {}
+    for result in results:
+        for key, value in result.items():
+            if isinstance(value, dict):
+                merged[key] = merge_results([merged.get(key, {}), value])
+            elif key in MAX_MERGED:
+                merged[key] = max(merged.get(key, 0), value)
+            else:
+                merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def skipped(name):
+    logger.info("%s уже выполняется, запуск пропущен", name)
+    return {"skipped": True}
 
 
 @shared_task
 def check_consultations():
-    change_consultation_status()
-    delete_expired_consultations()
+    lease = Lease("check_consultations")
+    if not lease.acquire():
+        return skipped("check_consultations")
+
+    now = timezone.now()
+    handed_off = False
+    try:
+        shards = maintenance_shards()
+        if len(shards) <= 1:
+            with lease.heartbeat():
+                return run_maintenance(now=now)
+
+        header = group(
+            check_consultations_shard.s(low, high, now.isoformat(), lease.token)
+            for low, high in shards
+        )
+        chord(header)(merge_maintenance_results.s(lease.token))
+        handed_off = True
+    finally:
+        # После запуска chord аренду освобождает merge_maintenance_results
+        if not handed_off:
+            lease.release()
+
+    return {"shards": len(shards)}
+
+
+@shared_task
+def check_consultations_shard(low, high, now, lease_token):
+    with Lease("check_consultations", token=lease_token).heartbeat():
+        return run_maintenance(
+            now=datetime.fromisoformat(now),
+            queryset=Consultation.objects.filter(pk__gte=low, pk__lte=high),
+        )
+
+
+@shared_task
+def merge_maintenance_results(results, lease_token):
+    Lease("check_consultations", token=lease_token).release()
+    merged = merge_results(results)
+    merged["shards"] = len(results)
+    return merged
+
+
+@shared_task
+def apply_status_transition(consultation_id):
+    return change_consultation_status(
+        queryset=Consultation.objects.filter(pk=consultation_id)
+    )
+
+
+@shared_task
+def plan_status_transitions():
+    lease = Lease("plan_status_transitions")
+    if not lease.acquire():
+        return skipped("plan_status_transitions")
+
+    try:
+        with lease.heartbeat():
+            return plan_due_buckets()
+    finally:
+        lease.release()
+
+
+@shared_task
+def generate_schedule_slots(days=None):
+    if days is None:
+        days = settings.CONSULTATIONS_SLOT_GENERATION_DAYS
+    today = timezone.localdate()
+    return generate_slots(today, today + timedelta(days=days - 1))
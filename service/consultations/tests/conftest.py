@@ -1,10 +1,70 @@
 import pytest
+from django.core.cache import cache
+from django.db import connection
 from django.utils import timezone
 
-from consultations.models import Clinic
+from consultations.models import Clinic, Consultation
 from users.models import User, Doctor, Patient
 
 
+# Ограничение consultation_doctor_no_overlap есть только в PostgreSQL
+# (миграция 0008); в тестовой SQLite его заменяют триггеры с тем же текстом
+# ошибки, поэтому вставки и обновления любым путем отсекаются так же
+OVERLAP_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS {name}_{event}
+BEFORE {event} ON consultations_consultation
+WHEN EXISTS (
+    SELECT 1 FROM consultations_consultation
+    WHERE doctor_id = NEW.doctor_id
+      AND start_date < NEW.end_date
+      AND end_date > NEW.start_date
+      AND id IS NOT NEW.id
+)
+BEGIN
+    SELECT RAISE(ABORT, '{name}');
+END
+"""
+
+
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    if connection.vendor == "postgresql":
+        return
+    with django_db_blocker.unblock(), connection.cursor() as cursor:
+        for event in ("insert", "update"):
+            cursor.execute(
+                OVERLAP_TRIGGER.format(
+                    name=Consultation.DOCTOR_OVERLAP_CONSTRAINT, event=event
+                )
+            )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def query_budget(settings):
+    """
+    Проверяет, что ответ тестового клиента уложился в бюджет запросов
+    представления из QUERY_BUDGETS (или в явно заданный максимум).
+    """
+
+    def check(response, budget=None):
+        request = response.wsgi_request
+        view_name = request.resolver_match.view_name
+        if budget is None:
+            budget = settings.QUERY_BUDGETS[view_name]
+        count = request.query_stats.count
+        assert count <= budget, f"{view_name}: {count} запросов при бюджете {budget}"
+        return count
+
+    return check
+
+
 @pytest.fixture
 def now():
     return timezone.now()
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from consultations.models import Consultation
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def consultations(now, clinic, doctor, other_doctor, patient):
+    rows = []
+    for index in range(6):
+        start = now + timedelta(hours=index + 1)
+        rows.append(
+            Consultation.objects.create(
+                clinic=clinic,
+                doctor=doctor if index % 2 else other_doctor,
+                patient=patient if index == 1 else None,
+                status=Consultation.PENDING if index < 3 else Consultation.CREATED,
+                start_date=start,
+                end_date=start + timedelta(minutes=30),
+            )
+        )
+    return rows
+
+
+@pytest.mark.django_db
+def test_list_is_flat_camel_case_and_cursor_paginated(
+    api_client, admin_user, consultations, patient, django_assert_max_num_queries
+):
+    api_client.force_authenticate(admin_user)
+    url = reverse("consultation-list")
+
+    with django_assert_max_num_queries(1):
+        response = api_client.get(url, {"page_size": 4})
+
+    assert response.status_code == 200
+    first = response.json()
+    assert [row["id"] for row in first["results"]] == [
+        c.pk for c in consultations[:4]
+    ]
+    booked = first["results"][1]
+    assert booked["patientName"] == str(patient.user)
+    assert booked["clinicName"] == consultations[1].clinic.name
+    assert first["results"][0]["patientName"] is None
+    assert "count" not in first
+
+    second = api_client.get(first["next"]).json()
+    assert [row["id"] for row in second["results"]] == [
+        c.pk for c in consultations[4:]
+    ]
+
+
+@pytest.mark.django_db
+def test_doctor_sees_only_own_consultations(
+    api_client, doctor_user, doctor, consultations
+):
+    api_client.force_authenticate(doctor_user)
+
+    results = api_client.get(reverse("consultation-list")).json()["results"]
+
+    assert {row["doctorId"] for row in results} == {doctor.pk}
+
+
+@pytest.mark.django_db
+def test_patient_sees_nothing(api_client, patient_user, consultations):
+    api_client.force_authenticate(patient_user)
+
+    response = api_client.get(reverse("consultation-list"))
+
+    assert response.json()["results"] == []
+
+
+@pytest.mark.django_db
+def test_filters(api_client, admin_user, consultations, doctor, now):
+    api_client.force_authenticate(admin_user)
+    url = reverse("consultation-list")
+
+    def ids(params):
+        return [row["id"] for row in api_client.get(url, params).json()["results"]]
+
+    assert ids({"status": Consultation.PENDING}) == [
+        c.pk for c in consultations[:3]
+    ]
+    assert ids({"doctor": doctor.pk}) == [c.pk for c in consultations[1::2]]
+    assert ids(
+        {
+            "date_from": (now + timedelta(hours=2)).isoformat(),
+            "date_to": (now + timedelta(hours=4)).isoformat(),
+        }
+    ) == [c.pk for c in consultations[1:3]]
+    assert api_client.get(url, {"clinic": "x"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_retrieve_and_read_only(api_client, admin_user, consultations):
+    api_client.force_authenticate(admin_user)
+    url = reverse("consultation-detail", args=[consultations[0].pk])
+
+    assert api_client.get(url).json()["id"] == consultations[0].pk
+    assert api_client.delete(url).status_code == 405
+
+
+@pytest.mark.django_db
+def test_user_routes_still_resolve(api_client, admin_user):
+    api_client.force_authenticate(admin_user)
+
+    response = api_client.get(reverse("user-detail", args=[admin_user.public_id]))
+
+    assert response.status_code == 200
@@ -0,0 +1,56 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@pytest.fixture
+def token_client(admin_user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(admin_user)}")
+    return client
+
+
+@pytest.mark.django_db
+def test_warm_request_does_not_query_user(token_client, django_assert_num_queries):
+    url = reverse("consultation-list")
+    assert token_client.get(url).status_code == 200
+
+    # Остается только запрос самих консультаций
+    with django_assert_num_queries(1):
+        assert token_client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_password_change_revokes_cached_token(token_client, admin_user):
+    url = reverse("consultation-list")
+    assert token_client.get(url).status_code == 200
+
+    admin_user.set_password("new-password")
+    admin_user.save()
+
+    response = token_client.get(url)
+    assert response.status_code == 401
+    assert response.data["code"] == "password_changed"
+
+
+@pytest.mark.django_db
+def test_deactivated_user_is_rejected(token_client, admin_user):
+    url = reverse("consultation-list")
+    assert token_client.get(url).status_code == 200
+
+    admin_user.is_active = False
+    admin_user.save()
+
+    assert token_client.get(url).status_code == 401
+
+
+@pytest.mark.django_db
+def test_role_change_is_applied_immediately(token_client, admin_user):
+    url = reverse("consultation-bulk")
+    assert token_client.post(url, {"operations": []}, format="json").status_code != 403
+
+    admin_user.role = admin_user.PATIENT
+    admin_user.save()
+
+    assert token_client.post(url, {"operations": []}, format="json").status_code == 403
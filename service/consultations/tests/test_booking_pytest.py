@@ -0,0 +1,115 @@
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.urls import reverse
+
+from consultations.booking import SlotHold, book_consultation
+from consultations.models import Consultation
+from users.models import User, Patient
+
+PARALLEL_PATIENTS = 8
+
+
+@pytest.fixture
+def free_slot(now, clinic, doctor):
+    return Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, minutes=30),
+    )
+
+
+def create_patients(count):
+    patients = []
+    for index in range(count):
+        user = User.objects.create_user(
+            email=f"storm{index}@example.com",
+            password="patpass",
+            first_name="Storm",
+            middle_name="S",
+            last_name=f"Patient{index}",
+            role=User.PATIENT,
+        )
+        patients.append(Patient.objects.create(user=user, phone="79990000000"))
+    return patients
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_registrations_book_slot_once(free_slot):
+    patients = create_patients(PARALLEL_PATIENTS)
+    barrier = threading.Barrier(PARALLEL_PATIENTS)
+
+    def register(patient):
+        barrier.wait()
+        try:
+            return book_consultation(free_slot.pk, patient)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=PARALLEL_PATIENTS) as executor:
+        results = list(executor.map(register, patients))
+
+    assert results.count(True) == 1
+    free_slot.refresh_from_db()
+    assert free_slot.patient == patients[results.index(True)]
+    assert free_slot.status == Consultation.CONFIRMED
+
+
+@pytest.mark.django_db
+def test_register_reports_taken_slot(client, free_slot, patient_user, patient):
+    other = create_patients(1)[0]
+    assert book_consultation(free_slot.pk, other)
+
+    client.force_login(patient_user)
+    url = reverse("consultations:register", kwargs={"pk": free_slot.pk})
+    response = client.post(url, follow=True)
+    messages = [str(message) for message in response.context["messages"]]
+    assert messages == ["Не удалось записаться: консультация уже занята или началась."]
+    free_slot.refresh_from_db()
+    assert free_slot.patient == other
+
+
+@pytest.mark.django_db
+def test_slot_hold_rejects_other_patients_before_database(
+    client, django_assert_num_queries, free_slot, patient_user, patient
+):
+    rival = create_patients(1)[0]
+    holder = SlotHold(free_slot.pk, rival.user_id)
+    assert holder.acquire()
+    assert SlotHold(free_slot.pk, rival.user_id).acquire()
+
+    client.force_login(patient_user)
+    url = reverse("consultations:register", kwargs={"pk": free_slot.pk})
+    detail = client.get(reverse("consultations:detail", kwargs={"pk": free_slot.pk}))
+    assert not detail.context["can_register"]
+    assert detail.context["slot_held_message"]
+    # Сессия и пользователь; к консультациям и пациентам запросов нет
+    with django_assert_num_queries(2):
+        client.post(url)
+    free_slot.refresh_from_db()
+    assert free_slot.patient is None
+    assert SlotHold.contention(free_slot.pk) == 1
+    assert SlotHold.contention() == 1
+
+    holder.release()
+    client.post(url)
+    free_slot.refresh_from_db()
+    assert free_slot.patient == patient
+
+
+def test_slot_contention_counter_expires_but_total_is_kept(settings):
+    settings.CONSULTATIONS_SLOT_CONTENTION_TTL = timedelta(hours=1)
+    assert SlotHold(1, 10).acquire()
+    assert not SlotHold(1, 20).acquire()
+    assert SlotHold.contention(1) == 1
+
+    later = time.time() + timedelta(days=30).total_seconds()
+    with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+        assert SlotHold.contention(1) == 0
+        assert SlotHold.contention() == 1
@@ -0,0 +1,210 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from consultations.bulk import Batch
+from consultations.models import Consultation
+
+URL = "/users/consultations/bulk/"
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def slots(now, clinic, doctor):
+    return [
+        Consultation.objects.create(
+            clinic=clinic,
+            doctor=doctor,
+            start_date=now + timedelta(hours=index + 1),
+            end_date=now + timedelta(hours=index + 1, minutes=30),
+        )
+        for index in range(3)
+    ]
+
+
+def post(client, operations):
+    return client.post(URL, {"operations": operations}, format="json")
+
+
+@pytest.mark.django_db
+def test_url_is_routed():
+    assert reverse("consultation-bulk") == URL
+
+
+@pytest.mark.django_db
+def test_mixed_batch_is_applied(
+    api_client, admin_user, slots, clinic, doctor, patient, now
+):
+    api_client.force_authenticate(admin_user)
+    moved_to = now + timedelta(days=1)
+
+    response = post(
+        api_client,
+        [
+            {"op": "create", "clinic": clinic.pk, "doctor": doctor.pk,
+             "startDate": (now + timedelta(days=2)).isoformat()},
+            {"op": "update", "id": slots[0].pk, "startDate": moved_to.isoformat(),
+             "endDate": (moved_to + timedelta(minutes=45)).isoformat(),
+             "patient": patient.pk},
+            {"op": "delete", "id": slots[1].pk},
+        ],
+    )
+
+    assert response.status_code == 200, response.json()
+    created_id = response.json()["results"][0]["id"]
+    created = Consultation.objects.get(pk=created_id)
+    assert created.end_date - created.start_date == timedelta(minutes=30)
+    assert created.search_text == "doc d user"
+    moved = Consultation.objects.get(pk=slots[0].pk)
+    assert moved.start_date == moved_to
+    assert moved.patient == patient
+    assert "pat" in moved.search_text
+    assert moved.updated_at > slots[0].updated_at
+    assert not Consultation.objects.filter(pk=slots[1].pk).exists()
+
+
+@pytest.mark.django_db
+def test_invalid_item_rejects_whole_batch(api_client, admin_user, slots, now):
+    api_client.force_authenticate(admin_user)
+
+    response = post(
+        api_client,
+        [
+            {"op": "delete", "id": slots[0].pk},
+            {"op": "create", "startDate": now.isoformat()},
+        ],
+    )
+
+    assert response.status_code == 400
+    assert [item["index"] for item in response.json()["results"]] == [1]
+    assert Consultation.objects.filter(pk=slots[0].pk).exists()
+
+
+@pytest.mark.django_db
+def test_overlaps_inside_batch_are_rejected(
+    api_client, admin_user, slots, clinic, doctor, now
+):
+    api_client.force_authenticate(admin_user)
+    start = (now + timedelta(days=3)).isoformat()
+    create = {
+        "op": "create", "clinic": clinic.pk, "doctor": doctor.pk, "startDate": start
+    }
+
+    response = post(api_client, [create, create])
+
+    assert response.status_code == 400
+    results = response.json()["results"]
+    assert all(
+        Consultation.DOCTOR_OVERLAP_ERROR in item["errors"]["startDate"]
+        for item in results
+    )
+    assert Consultation.objects.count() == len(slots)
+
+
+@pytest.mark.django_db
+def test_slot_freed_in_same_batch_can_be_reused(api_client, admin_user, slots):
+    api_client.force_authenticate(admin_user)
+
+    response = post(
+        api_client,
+        [
+            {"op": "delete", "id": slots[1].pk},
+            {"op": "update", "id": slots[0].pk,
+             "startDate": slots[1].start_date.isoformat(),
+             "endDate": slots[1].end_date.isoformat()},
+        ],
+    )
+
+    assert response.status_code == 200, response.json()
+
+
+@pytest.mark.django_db
+def test_doctor_is_limited_to_own_consultations(
+    api_client, doctor_user, doctor, other_doctor, clinic, now
+):
+    foreign = Consultation.objects.create(
+        clinic=clinic,
+        doctor=other_doctor,
+        start_date=now + timedelta(hours=1),
+        end_date=now + timedelta(hours=1, minutes=30),
+    )
+    api_client.force_authenticate(doctor_user)
+
+    response = post(api_client, [{"op": "delete", "id": foreign.pk}])
+    assert response.status_code == 400
+
+    response = post(
+        api_client,
+        [{"op": "create", "clinic": clinic.pk,
+          "startDate": (now + timedelta(days=1)).isoformat()}],
+    )
+    assert response.status_code == 200
+    created = Consultation.objects.get(pk=response.json()["results"][0]["id"])
+    assert created.doctor == doctor
+
+
+@pytest.mark.django_db
+def test_patient_is_forbidden(api_client, patient_user, patient):
+    api_client.force_authenticate(patient_user)
+
+    assert post(api_client, [{"op": "delete", "id": 1}]).status_code == 403
+
+
+@pytest.mark.django_db
+def test_batch_query_count_does_not_grow_with_size(
+    api_client, admin_user, clinic, doctor, now, django_assert_max_num_queries
+):
+    api_client.force_authenticate(admin_user)
+    operations = [
+        {"op": "create", "clinic": clinic.pk, "doctor": doctor.pk,
+         "startDate": (now + timedelta(hours=index + 1)).isoformat()}
+        for index in range(50)
+    ]
+
+    with django_assert_max_num_queries(10):
+        response = post(api_client, operations)
+
+    assert response.status_code == 200
+    assert Consultation.objects.count() == 50
+
+
+@pytest.mark.django_db
+def test_constraint_conflict_marks_only_conflicting_operations(
+    api_client, admin_user, clinic, doctor, now
+):
+    api_client.force_authenticate(admin_user)
+    first, second = now + timedelta(days=4), now + timedelta(days=5)
+
+    def concurrent_write(batch):
+        # Между проверкой пакета и записью другой запрос занял второе время
+        Consultation.objects.create(
+            clinic=clinic,
+            doctor=doctor,
+            start_date=second,
+            end_date=second + timedelta(minutes=30),
+        )
+        raise IntegrityError(Consultation.DOCTOR_OVERLAP_CONSTRAINT)
+
+    with mock.patch.object(Batch, "apply", autospec=True, side_effect=concurrent_write):
+        response = post(
+            api_client,
+            [
+                {"op": "create", "clinic": clinic.pk, "doctor": doctor.pk,
+                 "startDate": first.isoformat()},
+                {"op": "create", "clinic": clinic.pk, "doctor": doctor.pk,
+                 "startDate": second.isoformat()},
+            ],
+        )
+
+    assert response.status_code == 400
+    results = response.json()["results"]
+    assert "errors" not in results[0]
+    assert results[1]["errors"]["startDate"] == [Consultation.DOCTOR_OVERLAP_ERROR]
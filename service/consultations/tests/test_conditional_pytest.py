@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils.http import http_date
+
+from consultations.booking import SlotHold
+from consultations.models import Consultation
+
+
+@pytest.fixture
+def slot(clinic, doctor, now):
+    return Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(hours=1),
+        end_date=now + timedelta(hours=1, minutes=30),
+    )
+
+
+@pytest.mark.django_db
+def test_unchanged_list_answers_304_before_main_queries(
+    client, admin_user, slot, django_assert_max_num_queries
+):
+    client.force_login(admin_user)
+    url = reverse("consultations:list")
+    etag = client.get(url)["ETag"]
+
+    # Только сессия и пользователь
+    with django_assert_max_num_queries(2):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    response = client.get(url, {"sort": "status"}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_list_etag_changes_with_data_and_user(
+    client, admin_user, doctor_user, slot, clinic, doctor, now
+):
+    client.force_login(admin_user)
+    url = reverse("consultations:list")
+    etag = client.get(url)["ETag"]
+
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(hours=3),
+        end_date=now + timedelta(hours=3, minutes=30),
+    )
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    etag = client.get(url)["ETag"]
+    client.force_login(doctor_user)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_detail_validators(client, admin_user, slot):
+    client.force_login(admin_user)
+    url = reverse("consultations:detail", args=[slot.pk])
+    response = client.get(url)
+    etag = response["ETag"]
+    assert "Last-Modified" not in response
+
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    slot.status = Consultation.PENDING
+    slot.save()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_pending_messages_are_not_hidden_by_304(
+    client, patient_user, patient, slot, now
+):
+    # Консультация уже началась: запись не удастся и появится предупреждение
+    Consultation.objects.filter(pk=slot.pk).update(
+        start_date=now - timedelta(minutes=5)
+    )
+    client.force_login(patient_user)
+    url = reverse("consultations:list")
+    etag = client.get(url)["ETag"]
+
+    client.post(reverse("consultations:register", args=[slot.pk]))
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert "Не удалось записаться" in response.content.decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("view", ["list", "detail"])
+def test_relogin_invalidates_etag(client, admin_user, slot, view):
+    credentials = {"email": "admin@example.com", "password": "adminpass"}
+    client.post(reverse("login"), credentials)
+    url = reverse(
+        f"consultations:{view}", args=[slot.pk] if view == "detail" else []
+    )
+    etag = client.get(url)["ETag"]
+    csrf_token = client.cookies["csrftoken"].value
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    client.get(reverse("logout"))
+    client.post(reverse("login"), credentials)
+
+    # Вход сменил секрет CSRF: нужна страница с новыми токенами форм
+    assert client.cookies["csrftoken"].value != csrf_token
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_if_modified_since_alone_never_answers_304(
+    client, admin_user, patient_user, slot
+):
+    credentials = {"email": "admin@example.com", "password": "adminpass"}
+    client.post(reverse("login"), credentials)
+    url = reverse("consultations:detail", args=[slot.pk])
+    since = http_date(slot.updated_at.timestamp() + 60)
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code == 200
+
+    client.get(reverse("logout"))
+    client.post(reverse("login"), credentials)
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code == 200
+
+    # Удержание слота другим пациентом тоже не скрывается за 304
+    SlotHold(slot.pk, patient_user.pk).acquire()
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code == 200
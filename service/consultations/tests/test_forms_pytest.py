@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from consultations.forms import ConsultationCreateForm
+from consultations.models import Consultation
+from users.models import Doctor, User
+
+
+def add_doctors(count, start=0):
+    for index in range(start, start + count):
+        user = User.objects.create_user(
+            email=f"doctor{index}@example.com",
+            first_name=f"Doctor{index}",
+            middle_name="M",
+            last_name="Last",
+            role=User.DOCTOR,
+        )
+        Doctor.objects.create(user=user, speciality="Therapist")
+
+
+@pytest.mark.django_db
+def test_create_form_renders_doctors_without_n_plus_one(
+    admin_user, clinic, django_assert_num_queries
+):
+    add_doctors(30)
+
+    # Врачи вместе с пользователями и клиники: по одному запросу
+    with django_assert_num_queries(2):
+        ConsultationCreateForm(user=admin_user).as_p()
+    with django_assert_num_queries(0):
+        html = ConsultationCreateForm(user=admin_user).as_p()
+
+    assert html.count("Doctor") >= 30
+
+
+@pytest.mark.django_db
+def test_doctor_choices_are_invalidated_on_change(admin_user, clinic):
+    add_doctors(2)
+    ConsultationCreateForm(user=admin_user).as_p()
+
+    add_doctors(1, start=2)
+    user = User.objects.get(email="doctor0@example.com")
+    user.first_name = "Renamed"
+    user.save()
+    html = ConsultationCreateForm(user=admin_user).as_p()
+
+    assert "Doctor2 M Last" in html
+    assert "Renamed M Last" in html
+
+
+@pytest.mark.django_db
+def test_doctor_sees_only_own_profile(doctor_user, doctor, other_doctor):
+    form = ConsultationCreateForm(user=doctor_user)
+
+    assert list(form.fields["doctor"].queryset) == [doctor]
+
+
+@pytest.mark.django_db
+def test_update_page_query_count_does_not_grow_with_doctors(
+    client, admin_user, clinic, doctor, now, django_assert_max_num_queries
+):
+    consultation = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(hours=1),
+        end_date=now + timedelta(hours=1, minutes=30),
+    )
+    add_doctors(30)
+    client.force_login(admin_user)
+
+    with django_assert_max_num_queries(10):
+        response = client.get(reverse("consultations:update", args=[consultation.pk]))
+    assert response.status_code == 200
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from consultations.models import Consultation
+from consultations.tasks import change_consultation_status
+
+
+@pytest.fixture
+def slot(clinic, doctor, now):
+    return Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(minutes=5),
+        end_date=now + timedelta(minutes=35),
+    )
+
+
+def list_html(client):
+    return client.get(reverse("consultations:list")).content.decode()
+
+
+@pytest.mark.django_db
+def test_row_fragment_is_rerendered_after_change(client, admin_user, slot):
+    client.force_login(admin_user)
+    assert Consultation.CREATED in list_html(client)
+
+    slot.status = Consultation.PENDING
+    slot.save()
+
+    assert Consultation.PENDING in list_html(client)
+
+
+@pytest.mark.django_db
+def test_bulk_status_change_refreshes_row_version(client, admin_user, slot):
+    client.force_login(admin_user)
+    version = slot.updated_at
+    list_html(client)
+
+    change_consultation_status(now=slot.start_date + timedelta(minutes=1))
+    slot.refresh_from_db()
+
+    assert slot.updated_at > version
+    assert Consultation.STARTED in list_html(client)
+
+
+@pytest.mark.django_db
+def test_clinic_rename_refreshes_rows(client, admin_user, clinic, slot):
+    client.force_login(admin_user)
+    list_html(client)
+
+    clinic.name = "Renamed Clinic"
+    clinic.save()
+
+    assert "Renamed Clinic" in list_html(client)
+
+
+@pytest.mark.django_db
+def test_edit_links_and_csrf_form_are_not_shared_between_roles(
+    client, admin_user, patient_user, patient, slot
+):
+    update_url = reverse("consultations:update", args=[slot.pk])
+    client.force_login(admin_user)
+    assert update_url in list_html(client)
+
+    client.force_login(patient_user)
+    html = list_html(client)
+
+    assert update_url not in html
+    assert reverse("consultations:register", args=[slot.pk]) in html
+    assert html.count("csrfmiddlewaretoken") == 2
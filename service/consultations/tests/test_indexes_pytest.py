@@ -0,0 +1,61 @@
+import pytest
+from datetime import timedelta
+
+from django.db import connection
+from django.test import RequestFactory
+
+from consultations.models import Consultation
+from consultations.views import ConsultationListView
+
+SORT_MODES = [
+    {},
+    {"sort": "start_date", "order": "asc"},
+    {"sort": "start_date", "order": "desc"},
+    {"sort": "created", "order": "asc"},
+    {"sort": "created", "order": "desc"},
+    {"sort": "status", "order": "asc"},
+    {"sort": "status", "order": "desc"},
+]
+
+
+def sorts_without_index(plan):
+    """Есть ли в плане сортировка результата вместо чтения по индексу."""
+    if connection.vendor == "sqlite":
+        return "USE TEMP B-TREE FOR ORDER BY" in plan
+    if connection.vendor == "postgresql":
+        return "Sort Key" in plan and "Seq Scan on consultations_consultation" in plan
+    pytest.skip(f"EXPLAIN не разбирается для {connection.vendor}")
+
+
+@pytest.fixture
+def free_slots(now, clinic, doctor, patient):
+    slots = [
+        Consultation(
+            clinic=clinic,
+            doctor=doctor,
+            patient=patient if index % 2 else None,
+            status=Consultation.CREATED,
+            start_date=now + timedelta(hours=index + 1),
+            end_date=now + timedelta(hours=index + 1, minutes=30),
+        )
+        for index in range(50)
+    ]
+    slots = Consultation.objects.bulk_create(slots)
+    # Без статистики планировщик считает "patient IS NULL" селективным
+    # условием и выбирает индекс внешнего ключа
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return slots
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", SORT_MODES)
+def test_list_sort_modes_read_rows_in_index_order(admin_user, free_slots, params):
+    view = ConsultationListView()
+    view.request = RequestFactory().get("/", params)
+    view.request.user = admin_user
+    queryset = view.get_queryset()
+
+    plan = queryset[: view.paginate_by].explain()
+
+    assert not sorts_without_index(plan), plan
@@ -1,5 +1,6 @@
 import pytest
 from datetime import timedelta
+from django.db import IntegrityError, transaction
 from django.urls import reverse
 from django.utils import timezone
 
@@ -324,11 +325,215 @@ def test_delete_expired_consultations_logic(clinic, doctor):
         clinic=clinic,
         doctor=doctor,
         status=Consultation.PENDING,
-        start_date=now - timedelta(days=1),
-        end_date=now - timedelta(days=1) + timedelta(minutes=30),
+        start_date=now - timedelta(days=1) + timedelta(hours=1),
+        end_date=now - timedelta(days=1) + timedelta(hours=1, minutes=30),
     )
     from consultations.tasks import delete_expired_consultations
 
     delete_expired_consultations()
     assert not Consultation.objects.filter(pk=expired.pk).exists()
     assert Consultation.objects.filter(pk=keep.pk).exists()
+
+
+@pytest.mark.django_db
+def test_change_consultation_status_counts_only_changed_rows(clinic, doctor):
+    now = timezone.now()
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        status=Consultation.COMPLETED,
+        start_date=now - timedelta(hours=2),
+        end_date=now - timedelta(hours=1),
+    )
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        status=Consultation.CONFIRMED,
+        start_date=now - timedelta(hours=3),
+        end_date=now - timedelta(hours=2),
+    )
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        status=Consultation.STARTED,
+        start_date=now - timedelta(minutes=5),
+        end_date=now + timedelta(minutes=25),
+    )
+    from consultations.tasks import change_consultation_status
+
+    assert change_consultation_status(now=now) == {"completed": 1, "started": 0}
+    assert change_consultation_status(now=now) == {"completed": 0, "started": 0}
+
+
+@pytest.mark.django_db
+def test_delete_expired_consultations_in_batches(clinic, doctor):
+    now = timezone.now()
+    for hours in range(1, 6):
+        Consultation.objects.create(
+            clinic=clinic,
+            doctor=doctor,
+            status=Consultation.CREATED,
+            start_date=now - timedelta(hours=hours),
+            end_date=now - timedelta(hours=hours) + timedelta(minutes=30),
+        )
+    from consultations.tasks import delete_expired_consultations
+
+    assert delete_expired_consultations(now=now, batch_size=2) == 5
+    assert not Consultation.objects.exists()
+
+
+@pytest.mark.django_db
+def test_delete_expired_consultations_stops_at_time_limit(clinic, doctor):
+    now = timezone.now()
+    for hours in range(1, 4):
+        Consultation.objects.create(
+            clinic=clinic,
+            doctor=doctor,
+            status=Consultation.CREATED,
+            start_date=now - timedelta(hours=hours),
+            end_date=now - timedelta(hours=hours) + timedelta(minutes=30),
+        )
+    from consultations.tasks import delete_expired_consultations
+
+    deleted = delete_expired_consultations(
+        now=now, batch_size=2, time_limit=timedelta(0)
+    )
+    assert deleted == 2
+    assert Consultation.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_create_rejects_overlapping_consultation_for_doctor(
+    client, now, clinic, doctor_user, doctor, other_doctor
+):
+    start_dt = (now + timedelta(days=1)).replace(second=0, microsecond=0)
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=start_dt - timedelta(minutes=10),
+        end_date=start_dt + timedelta(minutes=20),
+    )
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=other_doctor,
+        start_date=start_dt,
+        end_date=start_dt + timedelta(minutes=30),
+    )
+    client.force_login(doctor_user)
+    data = {
+        "clinic": str(clinic.pk),
+        "doctor": str(doctor.pk),
+        "status": Consultation.CREATED,
+        "start_date": start_dt.strftime("%Y-%m-%dT%H:%M"),
+    }
+    response = client.post(reverse("consultations:create"), data)
+    assert response.status_code == 200
+    assert response.context["form"].errors["start_date"] == [
+        Consultation.DOCTOR_OVERLAP_ERROR
+    ]
+    assert Consultation.objects.filter(doctor=doctor).count() == 1
+
+    data["start_date"] = (start_dt + timedelta(minutes=20)).strftime("%Y-%m-%dT%H:%M")
+    response = client.post(reverse("consultations:create"), data)
+    assert response.status_code == 302
+    assert Consultation.objects.filter(doctor=doctor).count() == 2
+
+
+@pytest.mark.django_db
+def test_update_rejects_overlapping_consultation_for_doctor(
+    client, now, clinic, doctor_user, doctor
+):
+    first = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, minutes=30),
+    )
+    second = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(days=2),
+        end_date=now + timedelta(days=2, minutes=30),
+    )
+    client.force_login(doctor_user)
+    data = {
+        "clinic": str(clinic.pk),
+        "doctor": str(doctor.pk),
+        "patient": "",
+        "status": Consultation.CREATED,
+        "start_date": first.start_date + timedelta(minutes=15),
+        "end_date": first.end_date + timedelta(minutes=15),
+    }
+    url = reverse("consultations:update", kwargs={"pk": second.pk})
+    response = client.post(url, data)
+    assert response.status_code == 200
+    assert response.context["form"].errors["start_date"] == [
+        Consultation.DOCTOR_OVERLAP_ERROR
+    ]
+    second.refresh_from_db()
+    assert second.start_date == now + timedelta(days=2)
+
+
+@pytest.mark.django_db
+def test_overlap_constraint_covers_bulk_writes(now, clinic, doctor):
+    start = now + timedelta(days=1)
+    first = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=start,
+        end_date=start + timedelta(minutes=30),
+    )
+    overlapping = Consultation(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=start + timedelta(minutes=15),
+        end_date=start + timedelta(minutes=45),
+    )
+    with pytest.raises(IntegrityError) as error, transaction.atomic():
+        Consultation.objects.bulk_create([overlapping])
+    assert Consultation.is_doctor_overlap(error.value)
+
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=start + timedelta(hours=1),
+        end_date=start + timedelta(hours=1, minutes=30),
+    )
+    with pytest.raises(IntegrityError) as error, transaction.atomic():
+        Consultation.objects.filter(pk=first.pk).update(
+            end_date=start + timedelta(hours=1, minutes=10)
+        )
+    assert Consultation.is_doctor_overlap(error.value)
+
+    # Сдвиг без пересечения с другими консультациями проходит
+    Consultation.objects.filter(pk=first.pk).update(
+        end_date=start + timedelta(minutes=50)
+    )
+
+
+@pytest.mark.django_db
+def test_update_rejects_end_before_start(client, clinic, doctor, doctor_user, now):
+    consultation = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, minutes=30),
+    )
+    client.force_login(doctor_user)
+    response = client.post(
+        reverse("consultations:update", kwargs={"pk": consultation.pk}),
+        {
+            "clinic": str(clinic.pk),
+            "doctor": str(doctor.pk),
+            "patient": "",
+            "status": Consultation.CREATED,
+            "start_date": consultation.start_date,
+            "end_date": consultation.start_date - timedelta(minutes=30),
+        },
+    )
+    assert response.status_code == 200
+    assert response.context["form"].errors["end_date"] == [
+        "Окончание должно быть позже начала."
+    ]
+    consultation.refresh_from_db()
+    assert consultation.end_date == now + timedelta(days=1, minutes=30)
@@ -0,0 +1,112 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from consultations.list_cache import cache_stats, cached_page, list_generation
+from consultations.models import Consultation
+from consultations.tasks import change_consultation_status
+
+
+def make_slot(clinic, doctor, start):
+    return Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=start,
+        end_date=start + timedelta(minutes=30),
+    )
+
+
+@pytest.mark.django_db
+def test_identical_list_requests_are_served_from_cache(
+    client, admin_user, clinic, doctor, now
+):
+    make_slot(clinic, doctor, now + timedelta(hours=1))
+    client.force_login(admin_user)
+    url = reverse("consultations:list")
+
+    first = client.get(url, {"q": "  Doc ", "status": "создана,ожидает"})
+    second = client.get(url, {"q": "doc", "status": "ожидает,создана"})
+
+    assert cache_stats() == {"hits": 1, "misses": 1}
+    assert [obj.pk for obj in second.context["object_list"]] == [
+        obj.pk for obj in first.context["object_list"]
+    ]
+    assert second.context["paginator"].count == 1
+
+
+@pytest.mark.django_db
+def test_saving_consultation_invalidates_cached_pages(
+    client, admin_user, clinic, doctor, now
+):
+    make_slot(clinic, doctor, now + timedelta(hours=1))
+    client.force_login(admin_user)
+    url = reverse("consultations:list")
+    client.get(url)
+
+    created = make_slot(clinic, doctor, now + timedelta(hours=2))
+    response = client.get(url)
+
+    assert created.pk in [obj.pk for obj in response.context["object_list"]]
+    assert cache_stats()["hits"] == 0
+
+
+@pytest.mark.django_db
+def test_bulk_status_change_bumps_generation(clinic, doctor, now):
+    make_slot(clinic, doctor, now - timedelta(minutes=10))
+    generation = list_generation()
+
+    change_consultation_status(now=now)
+
+    assert list_generation() > generation
+
+
+def test_concurrent_misses_build_page_once():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return ["page"]
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cached_page("free", {}, loader))
+        )
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [["page"]] * 5
+
+
+def test_waiter_builds_page_itself_when_lock_outlives_it(settings):
+    settings.CONSULTATIONS_LIST_CACHE_LOCK_TTL = timedelta(seconds=1)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return ["page"]
+
+    holder = threading.Event()
+
+    def stuck_loader():
+        holder.wait(2)
+        return ["stale"]
+
+    thread = threading.Thread(target=cached_page, args=("free", {}, stuck_loader))
+    thread.start()
+    time.sleep(0.1)
+    try:
+        assert cached_page("free", {}, loader) == ["page"]
+    finally:
+        holder.set()
+        thread.join()
+    assert calls == [1]
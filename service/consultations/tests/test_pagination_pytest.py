@@ -0,0 +1,109 @@
+import base64
+import json
+
+import pytest
+from datetime import timedelta
+
+from django.http import QueryDict
+from django.urls import reverse
+
+from consultations.models import Consultation
+
+SORT_MODES = [
+    {},
+    {"sort": "start_date", "order": "desc"},
+    {"sort": "created", "order": "asc"},
+    {"sort": "status", "order": "desc"},
+]
+
+
+@pytest.fixture
+def free_slots(now, clinic, doctor):
+    statuses = [Consultation.CREATED, Consultation.PENDING, Consultation.PAID]
+    return [
+        Consultation.objects.create(
+            clinic=clinic,
+            doctor=doctor,
+            status=statuses[index % len(statuses)],
+            start_date=now + timedelta(hours=index + 1),
+            end_date=now + timedelta(hours=index + 1, minutes=30),
+        )
+        for index in range(45)
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", SORT_MODES)
+def test_cursor_pagination_matches_offset_order(client, admin_user, free_slots, params):
+    client.force_login(admin_user)
+    url = reverse("consultations:list")
+    expected = []
+    for page in (1, 2, 3):
+        response = client.get(url, {**params, "page": page})
+        expected.extend(obj.pk for obj in response.context["object_list"])
+
+    pages = []
+    cursor = None
+    while True:
+        query = {**params, "pagination": "cursor"}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get(url, query)
+        assert response.context["paginator"] is None
+        page = response.context["cursor_page"]
+        pages.append([obj.pk for obj in page.object_list])
+        if not page.has_next():
+            break
+        cursor = page.next_cursor
+
+    assert [pk for page in pages for pk in page] == expected
+    assert [len(page) for page in pages] == [20, 20, 5]
+
+    response = client.get(
+        url, {**params, "pagination": "cursor", "cursor": page.previous_cursor}
+    )
+    previous = response.context["cursor_page"]
+    assert [obj.pk for obj in previous.object_list] == pages[1]
+    assert previous.has_next() and previous.has_previous()
+    assert "cursor" not in QueryDict(response.context["query_without_page"])
+
+
+@pytest.mark.django_db
+def test_cursor_pagination_ignores_broken_cursor(client, admin_user, free_slots):
+    client.force_login(admin_user)
+    response = client.get(
+        reverse("consultations:list"), {"pagination": "cursor", "cursor": "???"}
+    )
+    page = response.context["cursor_page"]
+    assert len(page.object_list) == 20
+    assert not page.has_previous()
+
+
+def tampered(values):
+    payload = json.dumps({"d": "next", "v": values}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        tampered(["not-a-date", 1]),
+        tampered(["2025-13-45T99:00:00", 1]),
+        tampered([None, "not-a-pk"]),
+        tampered([{"nested": 1}, 10**30]),
+        tampered([None, 1]),
+        tampered(["2025-01-01T00:00:00+00:00", 10**30]),
+    ],
+)
+def test_cursor_pagination_ignores_tampered_cursor(
+    client, admin_user, free_slots, cursor
+):
+    client.force_login(admin_user)
+    response = client.get(
+        reverse("consultations:list"), {"pagination": "cursor", "cursor": cursor}
+    )
+    assert response.status_code == 200
+    page = response.context["cursor_page"]
+    assert len(page.object_list) == 20
+    assert not page.has_previous()
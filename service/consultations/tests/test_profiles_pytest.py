@@ -0,0 +1,72 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import Doctor, User
+
+
+def fresh(user):
+    return User.objects.get(pk=user.pk)
+
+
+@pytest.mark.django_db
+def test_profile_is_loaded_once_and_shared_between_requests(
+    doctor_user, doctor, django_assert_num_queries
+):
+    user = fresh(doctor_user)
+    with django_assert_num_queries(1):
+        assert user.profile == doctor
+        assert user.profile is user.profile
+        assert user.profile.user is user
+
+    other_request_user = fresh(doctor_user)
+    with django_assert_num_queries(0):
+        assert other_request_user.profile == doctor
+
+
+@pytest.mark.django_db
+def test_profile_change_invalidates_cache(doctor_user, doctor):
+    assert fresh(doctor_user).profile.speciality == "Therapist"
+
+    doctor.speciality = "Surgeon"
+    doctor.save()
+
+    assert fresh(doctor_user).profile.speciality == "Surgeon"
+
+
+@pytest.mark.django_db
+def test_missing_profile_is_cached_until_created(
+    doctor_user, django_assert_num_queries
+):
+    assert fresh(doctor_user).profile is None
+    user = fresh(doctor_user)
+    with django_assert_num_queries(0):
+        assert user.profile is None
+
+    doctor = Doctor.objects.create(user=doctor_user, speciality="Therapist")
+
+    assert fresh(doctor_user).profile == doctor
+
+
+@pytest.mark.django_db
+def test_admin_has_no_profile(admin_user, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        assert admin_user.profile is None
+
+
+@pytest.mark.django_db
+def test_create_page_reuses_cached_doctor_profile(client, doctor_user, doctor):
+    client.force_login(doctor_user)
+    url = reverse("consultations:create")
+    client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+
+    assert response.status_code == 200
+    assert not [
+        query["sql"]
+        for query in queries.captured_queries
+        if 'WHERE "users_doctor"."user_id" =' in query["sql"]
+    ]
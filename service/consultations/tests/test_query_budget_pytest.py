@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from consultations.models import Consultation
+from users.models import Doctor, Patient, User
+
+
+@pytest.fixture
+def crowded_list(now, clinic, doctor, patient):
+    """
+    Полная страница свободных слотов и блок записей пациента у разных
+    врачей: N+1 через Doctor.__str__/Patient.__str__ сразу выйдет за бюджет.
+    """
+    doctors = [doctor]
+    for index in range(5):
+        user = User.objects.create_user(
+            email=f"budget{index}@example.com",
+            first_name=f"Budget{index}",
+            middle_name="B",
+            last_name="Doctor",
+            role=User.DOCTOR,
+        )
+        doctors.append(Doctor.objects.create(user=user, speciality="Therapist"))
+
+    slots = []
+    for index in range(40):
+        start = now + timedelta(hours=index + 1)
+        slots.append(
+            Consultation.objects.create(
+                clinic=clinic,
+                doctor=doctors[index % len(doctors)],
+                patient=patient if index % 2 else None,
+                start_date=start,
+                end_date=start + timedelta(minutes=30),
+            )
+        )
+    return slots
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("role", ["admin_user", "doctor_user", "patient_user"])
+def test_list_view_within_budget(client, request, crowded_list, query_budget, role):
+    client.force_login(request.getfixturevalue(role))
+
+    response = client.get(reverse("consultations:list"))
+
+    assert response.status_code == 200
+    query_budget(response)
+
+
+@pytest.mark.django_db
+def test_detail_view_within_budget(client, patient_user, crowded_list, query_budget):
+    client.force_login(patient_user)
+
+    response = client.get(reverse("consultations:detail", args=[crowded_list[0].pk]))
+
+    assert response.status_code == 200
+    query_budget(response)
+
+
+@pytest.mark.django_db
+def test_create_view_within_budget(
+    client, admin_user, crowded_list, clinic, doctor, now, query_budget
+):
+    client.force_login(admin_user)
+    url = reverse("consultations:create")
+
+    query_budget(client.get(url))
+    response = client.post(
+        url,
+        {
+            "clinic": clinic.pk,
+            "doctor": doctor.pk,
+            "status": Consultation.CREATED,
+            "start_date": (now + timedelta(days=30)).strftime("%Y-%m-%dT%H:%M"),
+        },
+    )
+
+    assert response.status_code == 302
+    query_budget(response)
+
+
+@pytest.mark.django_db
+def test_register_view_within_budget(
+    client, patient_user, patient, crowded_list, query_budget
+):
+    client.force_login(patient_user)
+
+    response = client.post(
+        reverse("consultations:register", args=[crowded_list[0].pk])
+    )
+
+    assert response.status_code == 302
+    assert Patient.objects.get(pk=patient.pk).consultation_set.filter(
+        pk=crowded_list[0].pk
+    ).exists()
+    query_budget(response)
+
+
+@pytest.mark.django_db
+def test_budget_overrun_is_logged(client, admin_user, crowded_list, settings, caplog):
+    settings.QUERY_BUDGETS = {"consultations:list": 1}
+    client.force_login(admin_user)
+
+    with caplog.at_level("WARNING", logger="service.queries"):
+        client.get(reverse("consultations:list"))
+
+    assert "consultations:list" in caplog.text
+
+
+@pytest.mark.django_db
+def test_debug_headers(client, admin_user, settings):
+    settings.DEBUG = True
+    client.force_login(admin_user)
+
+    response = client.get(reverse("consultations:list"))
+
+    assert int(response["X-DB-Query-Count"]) > 0
+    assert "X-DB-Query-Time" in response
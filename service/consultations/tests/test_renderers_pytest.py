@@ -0,0 +1,90 @@
+import io
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from djangorestframework_camel_case.parser import CamelCaseJSONParser
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from rest_framework.test import APIClient
+
+from service.parsers import ORJSONCamelCaseParser
+from service.renderers import ORJSONCamelCaseRenderer
+
+MIXED = {
+    "public_id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "start_date": datetime(2025, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc),
+    "birth_date": date(2000, 1, 1),
+    "duration": timedelta(minutes=30),
+    "price": Decimal("1500.50"),
+    "ratio_1": 0.25,
+    "last_name": "Иванов 😀 </script>    \x01\n\"",
+    "nested_list": [{"first_name": "a", "is_active": True}, {"first_name": None}],
+    "tuple_value": (1, 2),
+    "set_value": {3},
+    10: "number key",
+    gettext_lazy("lazy_key"): gettext_lazy("lazy value"),
+    "html_2_pdf": [],
+    "_private": {},
+}
+
+
+def render(renderer_class, data, accepted_media_type=None):
+    return renderer_class().render(data, accepted_media_type, {})
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        MIXED,
+        [MIXED] * 3,
+        {"tiny": 1e-5, "huge": 1e16, "zero": -0.0},
+        {"big_int": 2**70},
+        None,
+        [],
+    ],
+)
+def test_output_matches_camel_case_renderer(data):
+    assert render(ORJSONCamelCaseRenderer, data) == render(
+        CamelCaseJSONRenderer, data
+    )
+
+
+def test_indented_output_matches_camel_case_renderer():
+    media_type = "application/json; indent=4"
+    assert render(ORJSONCamelCaseRenderer, MIXED, media_type) == render(
+        CamelCaseJSONRenderer, MIXED, media_type
+    )
+
+
+@pytest.mark.django_db
+def test_user_api_responses_are_unchanged(patient_user, admin_user):
+    admin_user.is_superuser = True
+    admin_user.save()
+    client = APIClient()
+    client.force_authenticate(admin_user)
+
+    for url in (
+        reverse("user-list"),
+        reverse("user-detail", args=[patient_user.public_id]),
+    ):
+        response = client.get(url)
+        assert response.content == render(CamelCaseJSONRenderer, response.data)
+        assert b'"publicId"' in response.content
+        assert b'"firstName"' in response.content
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"firstName": "A", "nestedList": [{"isActive": true}], "html2Pdf": 1}',
+        b'{"value": NaN, "big": 123456789012345678901234567890}',
+        "[{\"lastName\": \"Иванов\"}]".encode(),
+    ],
+)
+def test_parser_matches_camel_case_parser(body):
+    assert ORJSONCamelCaseParser().parse(io.BytesIO(body)) == (
+        CamelCaseJSONParser().parse(io.BytesIO(body))
+    )
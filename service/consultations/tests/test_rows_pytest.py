@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+
+from consultations.models import Consultation
+from consultations.rows import ConsultationRow, project_rows
+
+
+@pytest.mark.django_db
+def test_project_rows_flattens_related_names(clinic, doctor, patient, now):
+    booked = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        patient=patient,
+        start_date=now + timedelta(hours=1),
+        end_date=now + timedelta(hours=1, minutes=30),
+    )
+
+    [row] = project_rows(Consultation.objects.filter(pk=booked.pk))
+
+    assert row == ConsultationRow(
+        id=booked.pk,
+        clinic_name=clinic.name,
+        doctor_user_id=doctor.user_id,
+        doctor_last_name=doctor.user.last_name,
+        doctor_first_name=doctor.user.first_name,
+        patient_id=patient.pk,
+        patient_last_name=patient.user.last_name,
+        patient_first_name=patient.user.first_name,
+        status=booked.status,
+        start_date=booked.start_date,
+        end_date=booked.end_date,
+        updated_at=booked.updated_at,
+    )
+    assert row.pk == booked.pk
+
+
+@pytest.mark.django_db
+def test_list_renders_projected_rows(client, doctor_user, clinic, doctor, now):
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(hours=1),
+        end_date=now + timedelta(hours=1, minutes=30),
+    )
+    client.force_login(doctor_user)
+
+    response = client.get(reverse("consultations:list"), {"pagination": "cursor"})
+
+    [row] = response.context["object_list"]
+    assert isinstance(row, ConsultationRow)
+    assert row.can_edit
+    name = f"{doctor_user.last_name} {doctor_user.first_name}"
+    assert name in response.content.decode()
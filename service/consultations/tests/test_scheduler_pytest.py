@@ -0,0 +1,68 @@
+import pytest
+from datetime import timedelta
+from unittest import mock
+
+from consultations.models import Consultation
+from consultations.scheduler import plan_due_buckets, schedule_status_transitions
+
+
+@pytest.mark.django_db
+def test_schedule_status_transitions_only_within_horizon(
+    django_capture_on_commit_callbacks, now, clinic, doctor
+):
+    soon = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(minutes=2),
+        end_date=now + timedelta(minutes=32),
+    )
+    later = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, minutes=30),
+    )
+    with django_capture_on_commit_callbacks() as callbacks:
+        assert schedule_status_transitions(soon, now=now) == 1
+        assert schedule_status_transitions(later, now=now) == 0
+    assert len(callbacks) == 1
+
+
+@pytest.mark.django_db
+def test_plan_due_buckets_schedules_each_bucket_once(
+    django_capture_on_commit_callbacks, now, clinic, doctor
+):
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(minutes=3),
+        end_date=now + timedelta(minutes=8),
+    )
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(hours=3),
+        end_date=now + timedelta(hours=3, minutes=30),
+    )
+    with mock.patch(
+        "consultations.tasks.apply_status_transition.apply_async"
+    ) as apply_async, django_capture_on_commit_callbacks(execute=True):
+        assert plan_due_buckets(now=now) == 2
+        assert plan_due_buckets(now=now) == 0
+    assert apply_async.call_count == 2
+
+
+@pytest.mark.django_db
+def test_apply_status_transition_ignores_stale_eta(now, clinic, doctor):
+    consult = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        status=Consultation.CONFIRMED,
+        start_date=now + timedelta(hours=1),
+        end_date=now + timedelta(hours=1, minutes=30),
+    )
+    from consultations.tasks import apply_status_transition
+
+    assert apply_status_transition(consult.pk) == {"completed": 0, "started": 0}
+    consult.refresh_from_db()
+    assert consult.status == Consultation.CONFIRMED
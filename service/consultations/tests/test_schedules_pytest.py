@@ -0,0 +1,134 @@
+import pytest
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.utils import timezone
+
+from consultations.models import Consultation, ScheduleBreak, ScheduleTemplate
+from consultations.schedules import generate_slots, template_slots
+from consultations.scheduler import plan_due_buckets
+
+# Понедельник далеко в будущем, чтобы слоты не отсекались как прошедшие
+MONDAY = date(2099, 1, 5)
+
+
+@pytest.fixture
+def template(clinic, doctor):
+    template = ScheduleTemplate.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        weekday=0,
+        start_time=time(9, 0),
+        end_time=time(12, 0),
+        slot_duration=30,
+    )
+    ScheduleBreak.objects.create(
+        template=template, start_time=time(10, 0), end_time=time(10, 45)
+    )
+    return template
+
+
+def aware(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+@pytest.mark.django_db
+def test_generate_slots_respects_breaks_and_batches(template):
+    created = generate_slots(MONDAY, MONDAY + timedelta(days=6), batch_size=2)
+
+    assert created == 4
+    starts = list(
+        Consultation.objects.order_by("start_date").values_list(
+            "start_date", flat=True
+        )
+    )
+    assert starts == [
+        aware(MONDAY, 9),
+        aware(MONDAY, 9, 30),
+        aware(MONDAY, 10, 45),
+        aware(MONDAY, 11, 15),
+    ]
+    assert all(
+        status == Consultation.CREATED
+        for status in Consultation.objects.values_list("status", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_generated_slots_in_planned_buckets_are_scheduled(
+    django_capture_on_commit_callbacks, template
+):
+    now = aware(MONDAY, 8, 55)
+    with mock.patch(
+        "consultations.tasks.apply_status_transition.apply_async"
+    ) as apply_async, django_capture_on_commit_callbacks(execute=True):
+        # Тик уже спланировал корзины горизонта, пока слотов не было
+        assert plan_due_buckets(now=now) == 0
+        assert generate_slots(MONDAY, MONDAY, batch_size=2, now=now) == 4
+
+    first = Consultation.objects.get(start_date=aware(MONDAY, 9))
+    apply_async.assert_called_once_with((first.pk,), eta=first.start_date)
+
+
+@pytest.mark.django_db
+def test_generate_slots_skips_existing(template, clinic, doctor):
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=aware(MONDAY, 9),
+        end_date=aware(MONDAY, 9, 30),
+    )
+    assert generate_slots(MONDAY, MONDAY) == 3
+    assert generate_slots(MONDAY, MONDAY) == 0
+    assert Consultation.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_generate_slots_command(template):
+    out = StringIO()
+    call_command(
+        "generate_slots", "--start", MONDAY.isoformat(), "--days", "7", stdout=out
+    )
+    assert "4" in out.getvalue()
+    assert Consultation.objects.count() == 4
+
+
+@pytest.mark.django_db
+def test_generate_slots_skips_slots_overlapping_existing(template, clinic, doctor):
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=aware(MONDAY, 9, 15),
+        end_date=aware(MONDAY, 9, 45),
+    )
+    assert generate_slots(MONDAY, MONDAY) == 2
+    assert not Consultation.objects.filter(start_date=aware(MONDAY, 9)).exists()
+
+
+@pytest.mark.django_db
+def test_zero_slot_duration_yields_no_slots(template):
+    template.slot_duration = 0
+    assert list(template_slots(template, MONDAY)) == []
+
+
+@pytest.mark.django_db
+def test_zero_slot_duration_is_rejected(template):
+    template.slot_duration = 0
+    with pytest.raises(ValidationError) as error:
+        template.full_clean()
+    assert "slot_duration" in error.value.message_dict
+
+    with pytest.raises(IntegrityError):
+        template.save()
+
+
+@pytest.mark.django_db
+def test_end_time_must_be_after_start_time(template):
+    template.end_time = template.start_time
+    with pytest.raises(ValidationError) as error:
+        template.full_clean()
+    assert "end_time" in error.value.message_dict
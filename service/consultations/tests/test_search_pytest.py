@@ -0,0 +1,112 @@
+import importlib
+
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.apps import apps as django_apps
+from django.core.management import call_command
+
+from consultations.booking import book_consultation
+from consultations.models import Consultation
+from consultations.search import filter_by_person_name
+
+
+@pytest.mark.django_db
+def test_filter_by_person_name_requires_every_token(
+    now, clinic, doctor, other_doctor, patient
+):
+    booked = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        patient=patient,
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, minutes=30),
+    )
+    free = Consultation.objects.create(
+        clinic=clinic,
+        doctor=other_doctor,
+        start_date=now + timedelta(days=2),
+        end_date=now + timedelta(days=2, minutes=30),
+    )
+
+    def search(q):
+        return set(filter_by_person_name(Consultation.objects.all(), q))
+
+    assert search("doc pat") == {booked}
+    assert search("john doe") == {free}
+    assert search("user") == {booked}
+    assert search("doc john") == set()
+
+
+@pytest.mark.django_db
+def test_search_text_follows_names_and_booking(
+    now, clinic, doctor, doctor_user, patient
+):
+    consult = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, minutes=30),
+    )
+    assert consult.search_text == "doc d user"
+
+    assert book_consultation(consult.pk, patient)
+    consult.refresh_from_db()
+    assert consult.search_text == "doc d user pat p user"
+
+    doctor_user.last_name = "Семёнов"
+    doctor_user.save()
+    consult.refresh_from_db()
+    assert consult.search_text == "doc d семенов pat p user"
+    assert list(filter_by_person_name(Consultation.objects.all(), "СЕМЁН")) == [
+        consult
+    ]
+
+    consult.patient = None
+    consult.save(update_fields=["patient"])
+    consult.refresh_from_db()
+    assert consult.search_text == "doc d семенов"
+
+
+@pytest.mark.django_db
+def test_backfill_search_text_command(now, clinic, doctor):
+    consult = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, minutes=30),
+    )
+    Consultation.objects.update(search_text="")
+    out = StringIO()
+    call_command("backfill_search_text", stdout=out)
+    consult.refresh_from_db()
+    assert consult.search_text == "doc d user"
+    assert "1" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_migration_fills_search_text_for_existing_rows(now, clinic, doctor, patient):
+    migration = importlib.import_module(
+        "consultations.migrations.0009_consultation_search_text"
+    )
+    booked = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        patient=patient,
+        start_date=now + timedelta(days=1),
+        end_date=now + timedelta(days=1, minutes=30),
+    )
+    free = Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        start_date=now + timedelta(days=2),
+        end_date=now + timedelta(days=2, minutes=30),
+    )
+    expected = {c.pk: c.search_text for c in (booked, free)}
+    # Так колонка выглядит сразу после AddField
+    Consultation.objects.update(search_text="")
+
+    migration.fill_search_text(django_apps, None)
+
+    assert dict(Consultation.objects.values_list("pk", "search_text")) == expected
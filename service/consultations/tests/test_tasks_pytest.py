@@ -0,0 +1,200 @@
+import json
+import pytest
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django_celery_results.models import TaskResult
+
+from consultations.locks import RENEW_SCRIPT, Lease
+from consultations.models import Consultation
+from consultations.tasks import (
+    check_consultations,
+    check_consultations_shard,
+    maintenance_shards,
+    merge_maintenance_results,
+    merge_results,
+    plan_status_transitions,
+)
+
+
+def create_past_consultations(clinic, doctor, now, count):
+    return [
+        Consultation.objects.create(
+            clinic=clinic,
+            doctor=doctor,
+            status=Consultation.CONFIRMED,
+            start_date=now - timedelta(hours=2 * index + 2),
+            end_date=now - timedelta(hours=2 * index + 1),
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_maintenance_shards_cover_pk_range(settings, now, clinic, doctor):
+    settings.CONSULTATIONS_MAINTENANCE_SHARDS = 3
+    settings.CONSULTATIONS_MAINTENANCE_MIN_SHARD_SIZE = 1
+    consultations = create_past_consultations(clinic, doctor, now, 7)
+    shards = maintenance_shards()
+
+    assert len(shards) == 3
+    assert shards[0][0] == consultations[0].pk
+    assert shards[-1][1] == consultations[-1].pk
+    for (_, high), (low, _) in zip(shards, shards[1:]):
+        assert low == high + 1
+
+
+@pytest.mark.django_db
+def test_check_consultations_runs_inline_for_small_table(now, clinic, doctor):
+    create_past_consultations(clinic, doctor, now, 2)
+    result = check_consultations()
+    phases = result.pop("phases")
+    assert result == {"completed": 2, "started": 0, "deleted": 0}
+    # Без CONSULTATIONS_MAINTENANCE_COUNT_SCANNED лишнего COUNT нет
+    assert phases["change_consultation_status"]["queries"] == 2
+    assert phases["change_consultation_status"]["rows_scanned"] == 0
+    assert phases["change_consultation_status"]["rows_changed"] == 2
+    assert phases["delete_expired_consultations"]["rows_changed"] == 0
+
+
+@pytest.mark.django_db
+def test_status_phase_counts_scanned_rows_on_request(settings, now, clinic, doctor):
+    settings.CONSULTATIONS_MAINTENANCE_COUNT_SCANNED = True
+    create_past_consultations(clinic, doctor, now, 2)
+    # Уже завершенная консультация проверяется, но не меняется
+    Consultation.objects.create(
+        clinic=clinic,
+        doctor=doctor,
+        status=Consultation.COMPLETED,
+        start_date=now - timedelta(hours=10),
+        end_date=now - timedelta(hours=9),
+    )
+    result = check_consultations()
+    phases = result.pop("phases")
+    assert result == {"completed": 2, "started": 0, "deleted": 0}
+    assert phases["change_consultation_status"]["rows_scanned"] == 3
+    assert phases["change_consultation_status"]["rows_changed"] == 2
+    assert phases["change_consultation_status"]["queries"] == 3
+
+
+@pytest.mark.django_db
+def test_check_consultations_fans_out_and_merges(settings, now, clinic, doctor):
+    settings.CONSULTATIONS_MAINTENANCE_MIN_SHARD_SIZE = 1
+    create_past_consultations(clinic, doctor, now, 4)
+    with mock.patch("consultations.tasks.chord") as chord:
+        assert check_consultations() == {"shards": 4}
+    header = list(chord.call_args.args[0].tasks)
+    assert len(header) == 4
+    lease_token = chord.return_value.call_args.args[0].args[0]
+    assert not Lease("check_consultations").acquire()
+
+    results = [check_consultations_shard(*task.args) for task in header]
+    merged = merge_maintenance_results(results, lease_token)
+    phases = merged.pop("phases")
+    assert merged == {"completed": 4, "started": 0, "deleted": 0, "shards": 4}
+    assert phases["change_consultation_status"]["rows_changed"] == 4
+    assert Lease("check_consultations").acquire()
+
+
+def test_merge_results_takes_longest_shard_as_wall_time():
+    shards = [
+        {"completed": 1, "phases": {"p": {"wall_time": 2.0, "cpu_time": 1.5}}},
+        {"completed": 2, "phases": {"p": {"wall_time": 3.0, "cpu_time": 2.5}}},
+    ]
+    assert merge_results(shards) == {
+        "completed": 3,
+        "phases": {"p": {"wall_time": 3.0, "cpu_time": 4.0}},
+    }
+
+
+def test_lease_renew_and_release_require_owner_token():
+    owner = Lease("test")
+    assert owner.acquire()
+    intruder = Lease("test")
+    assert not intruder.acquire()
+    assert not intruder.renew()
+
+    intruder.release()
+    assert owner.renew()
+    owner.release()
+    assert intruder.acquire()
+
+
+class FakeRedis:
+    """Redis, выполняющий скрипты аренды как атомарные операции."""
+
+    def __init__(self):
+        self.store = {}
+        self.expires = {}
+
+    def register_script(self, script):
+        def run(keys, args):
+            (key,) = keys
+            if self.store.get(key) != args[0]:
+                return 0
+            if script == RENEW_SCRIPT:
+                self.expires[key] = args[1]
+            else:
+                del self.store[key]
+            return 1
+
+        return run
+
+
+def test_lease_renew_and_release_are_atomic_on_redis(settings):
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": "redis://127.0.0.1:6379/15",
+        }
+    }
+    redis = FakeRedis()
+    owner, other = Lease("test"), Lease("test")
+    key = cache.client.make_key(owner.key)
+    # Аренда владельца истекла и уже досталась другому держателю
+    redis.store[key] = cache.client.encode(other.token)
+
+    with mock.patch("consultations.locks.get_redis_connection", return_value=redis):
+        assert not owner.renew()
+        owner.release()
+        assert redis.store[key] == cache.client.encode(other.token)
+
+        assert other.renew()
+        assert redis.expires[key] == other.ttl
+        other.release()
+    assert key not in redis.store
+
+
+@pytest.mark.django_db
+def test_overlapping_maintenance_runs_are_skipped(now, clinic, doctor):
+    create_past_consultations(clinic, doctor, now, 1)
+    lease = Lease("check_consultations")
+    assert lease.acquire()
+    assert check_consultations() == {"skipped": True}
+    assert Consultation.objects.filter(status=Consultation.CONFIRMED).count() == 1
+
+    lease.release()
+    assert check_consultations()["completed"] == 1
+
+    assert Lease("plan_status_transitions").acquire()
+    assert plan_status_transitions() == {"skipped": True}
+
+
+@pytest.mark.django_db
+def test_maintenance_report_lists_phase_metrics(now, clinic, doctor):
+    create_past_consultations(clinic, doctor, now, 1)
+    TaskResult.objects.create(
+        task_id="maintenance-run",
+        task_name="consultations.tasks.check_consultations",
+        status="SUCCESS",
+        result=json.dumps(check_consultations()),
+    )
+    out = StringIO()
+    call_command("maintenance_report", stdout=out)
+    lines = out.getvalue().splitlines()
+    assert len(lines) == 2
+    assert "change_consultation_status" in lines[0]
+    assert "changed=1" in lines[0]
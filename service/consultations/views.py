@@ -1,7 +1,11 @@
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.shortcuts import render, redirect
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.http import condition
 from django.views.generic import (
     ListView,
     DetailView,
@@ -10,52 +14,97 @@ from django.views.generic import (
 )
 from datetime import timedelta
 from django.utils import timezone
-from django.db.models import Q
-import re
-
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Concat
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+
+from consultations.access import scope_consultations
+from consultations.booking import SlotHold, book_consultation
+from consultations.bulk import apply_operations
+from consultations.conditional import (
+    detail_etag,
+    list_etag,
+)
 from consultations.models import Consultation
-from consultations.forms import ConsultationCreateForm
+from consultations.forms import ConsultationCreateForm, ConsultationUpdateForm
+from consultations.list_cache import cached_page, normalize_list_params
+from consultations.pagination import ConsultationCursorPagination, CursorPaginator
+from consultations.rows import project_rows
+from consultations.scheduler import schedule_status_transitions
+from consultations.search import filter_by_person_name
+from consultations.serializers import (
+    ConsultationFilterSerializer,
+    ConsultationOperationSerializer,
+    ConsultationSerializer,
+)
 from users.models import User, Doctor, Patient
 
+SLOT_HELD_MESSAGE = "Слот сейчас бронирует другой пациент, попробуйте позже."
 
-class ConsultationQuerysetMixin:
-    """
-    Ограничивает доступ к данным:
-    - admin/is_staff: видят всё
-    - doctor: только свои консультации
-    """
 
+class ConsultationQuerysetMixin:
     def get_queryset(self):
         base_qs = Consultation.objects.select_related(
             "clinic", "doctor", "doctor__user", "patient", "patient__user"
         ).order_by("-start_date")
-        user = self.request.user
-
-        if (
-            getattr(user, "is_staff", False)
-            or getattr(user, "role", None) == User.ADMIN
-        ):
-            return base_qs
-
-        if getattr(user, "role", None) == User.DOCTOR:
-            try:
-                doctor = Doctor.objects.get(user=user)
-            except Doctor.DoesNotExist:
-                return base_qs.none()
-            return base_qs.filter(doctor=doctor)
-
-        return base_qs.none()
+        return scope_consultations(base_qs, self.request.user)
 
 
+@method_decorator(condition(etag_func=list_etag), name="get")
 class ConsultationListView(LoginRequiredMixin, ListView):
     model = Consultation
     paginate_by = 20
     template_name = "consultations/list.html"
+    cursor_page = None
+
+    def paginate_queryset(self, queryset, page_size):
+        # Список свободных слотов одинаков для всех ролей
+        result = cached_page(
+            "free",
+            normalize_list_params(self.request.GET),
+            lambda: self.load_page(queryset, page_size),
+        )
+        if "cursor_page" in result:
+            self.cursor_page = result["cursor_page"]
+            return None, None, self.cursor_page.object_list, False
+
+        paginator = self.get_paginator(
+            queryset,
+            page_size,
+            orphans=self.get_paginate_orphans(),
+            allow_empty_first_page=self.get_allow_empty(),
+        )
+        paginator.count = result["count"]
+        page = paginator.page(result["number"])
+        page.object_list = result["object_list"]
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def load_page(self, queryset, page_size):
+        # ?pagination=cursor включает навигацию по ключу сортировки без COUNT(*)
+        if self.request.GET.get("pagination") != "cursor":
+            paginator, page, object_list, _ = super().paginate_queryset(
+                queryset, page_size
+            )
+            return {
+                "count": paginator.count,
+                "number": page.number,
+                "object_list": list(object_list),
+            }
+
+        # created_at пуст у старых записей и растет вместе с pk,
+        # поэтому для сортировки по дате создания ключом служит pk
+        ordering = [
+            name.replace("created_at", "pk") for name in queryset.query.order_by
+        ]
+        paginator = CursorPaginator(queryset, ordering, page_size)
+        return {"cursor_page": paginator.page(self.request.GET.get("cursor"))}
 
     def get_queryset(self):
-        qs = Consultation.objects.select_related(
-            "clinic", "doctor", "doctor__user", "patient", "patient__user"
-        ).filter(patient__isnull=True)
+        qs = Consultation.objects.filter(patient__isnull=True)
 
         # Query params
         q = self.request.GET.get("q", "").strip()
@@ -71,17 +120,7 @@ class ConsultationListView(LoginRequiredMixin, ListView):
 
         # Поиск по ФИО врача и пациента
         if q:
-            tokens = [t for t in re.split(r"\s+", q) if t]
-            for tok in tokens:
-                token_q = (
-                    Q(doctor__user__first_name__icontains=tok)
-                    | Q(doctor__user__middle_name__icontains=tok)
-                    | Q(doctor__user__last_name__icontains=tok)
-                    | Q(patient__user__first_name__icontains=tok)
-                    | Q(patient__user__middle_name__icontains=tok)
-                    | Q(patient__user__last_name__icontains=tok)
-                )
-                qs = qs.filter(token_q)
+            qs = filter_by_person_name(qs, q)
 
         # Сортировка
         if sort == "created":
@@ -102,31 +141,19 @@ class ConsultationListView(LoginRequiredMixin, ListView):
         else:
             qs = qs.order_by("start_date")
 
-        return qs
+        return project_rows(qs)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         now = timezone.now()
 
-        upcoming = Consultation.objects.select_related(
-            "clinic", "doctor", "doctor__user", "patient", "patient__user"
-        ).filter(patient__isnull=False)
+        upcoming = project_rows(Consultation.objects.filter(patient__isnull=False))
 
         # Поиск по ФИО врача/пациента для блока ближайших консультаций
         q = self.request.GET.get("q", "").strip()
         if q:
-            tokens = [t for t in re.split(r"\s+", q) if t]
-            for tok in tokens:
-                token_q = (
-                    Q(doctor__user__first_name__icontains=tok)
-                    | Q(doctor__user__middle_name__icontains=tok)
-                    | Q(doctor__user__last_name__icontains=tok)
-                    | Q(patient__user__first_name__icontains=tok)
-                    | Q(patient__user__middle_name__icontains=tok)
-                    | Q(patient__user__last_name__icontains=tok)
-                )
-                upcoming = upcoming.filter(token_q)
+            upcoming = filter_by_person_name(upcoming, q)
 
         # Сортировка для блока ближайших консультаций
         sort = self.request.GET.get("sort", "").strip()
@@ -147,25 +174,27 @@ class ConsultationListView(LoginRequiredMixin, ListView):
                 )
             return qs.order_by("start_date")
 
+        list_params = normalize_list_params(self.request.GET)
+        upcoming_params = {name: list_params[name] for name in ("q", "sort", "order")}
+
+        def cached_upcoming(scope, qs):
+            return cached_page(
+                scope, upcoming_params, lambda: list(order_upcoming(qs)[:20])
+            )
+
         if getattr(user, "role", None) == User.DOCTOR:
-            try:
-                doctor = Doctor.objects.get(user=user)
-            except Doctor.DoesNotExist:
-                doctor = None
+            doctor = user.profile
             if doctor is not None:
-                context["upcoming_list"] = order_upcoming(
-                    upcoming.filter(doctor=doctor)
-                )[:20]
+                context["upcoming_list"] = cached_upcoming(
+                    f"doctor:{doctor.pk}", upcoming.filter(doctor=doctor)
+                )
                 context["upcoming_title"] = "Ближайшие консультации с пациентами"
         elif getattr(user, "role", None) == User.PATIENT:
-            try:
-                patient = Patient.objects.get(user=user)
-            except Patient.DoesNotExist:
-                patient = None
+            patient = user.profile
             if patient is not None:
-                context["upcoming_list"] = order_upcoming(
-                    upcoming.filter(patient=patient)
-                )[:20]
+                context["upcoming_list"] = cached_upcoming(
+                    f"patient:{patient.pk}", upcoming.filter(patient=patient)
+                )
                 context["upcoming_title"] = "Мои ближайшие консультации"
 
         context["now"] = now
@@ -176,23 +205,37 @@ class ConsultationListView(LoginRequiredMixin, ListView):
         context["is_doctor"] = getattr(user, "role", None) == User.DOCTOR
         context["is_patient"] = getattr(user, "role", None) == User.PATIENT
 
+        # Права на изменение входят в ключ кэша фрагмента строки
+        for row in (*context["object_list"], *context.get("upcoming_list", ())):
+            row.can_edit = context["is_admin"] or (
+                context["is_doctor"] and row.doctor_user_id == user.id
+            )
+        context["row_cache_timeout"] = int(
+            settings.CONSULTATIONS_ROW_CACHE_TTL.total_seconds()
+        )
+
         params = self.request.GET.copy()
-        if "page" in params:
-            for _ in range(len(params.getlist("page"))):
-                try:
-                    del params["page"]
-                except Exception:
-                    break
+        for key in ("page", "cursor"):
+            if key in params:
+                for _ in range(len(params.getlist(key))):
+                    try:
+                        del params[key]
+                    except Exception:
+                        break
+
+        context["cursor_page"] = self.cursor_page
 
         context["query_without_page"] = params.urlencode()
         context["current_q"] = self.request.GET.get("q", "").strip()
         context["current_sort"] = self.request.GET.get("sort", "").strip()
         context["current_order"] = self.request.GET.get("order", "asc").strip()
         context["current_status"] = self.request.GET.get("status", "").strip()
+        context["current_pagination"] = self.request.GET.get("pagination", "").strip()
 
         return context
 
 
+@method_decorator(condition(etag_func=detail_etag), name="get")
 class ConsultationDetailView(LoginRequiredMixin, DetailView):
     model = Consultation
     template_name = "consultations/detail.html"
@@ -213,8 +256,11 @@ class ConsultationDetailView(LoginRequiredMixin, DetailView):
             and obj.patient is None
             and obj.start_date > timezone.now()
         ):
-            # есть профиль пациента
-            can_register = Patient.objects.filter(user=user).exists()
+            if SlotHold(obj.pk, user.pk).held_by_other():
+                context["slot_held_message"] = SLOT_HELD_MESSAGE
+            else:
+                # есть профиль пациента
+                can_register = user.profile is not None
         context["can_register"] = can_register
         return context
 
@@ -246,9 +292,8 @@ class ConsultationCreateView(LoginRequiredMixin, View):
         clinic = form.cleaned_data["clinic"]
         user_role = getattr(request.user, "role", None)
         if user_role == User.DOCTOR and not getattr(request.user, "is_staff", False):
-            try:
-                doctor = Doctor.objects.get(user=request.user)
-            except Doctor.DoesNotExist:
+            doctor = request.user.profile
+            if doctor is None:
                 form.add_error(None, "Для вашего пользователя не найден профиль врача.")
                 return render(request, self.template_name, {"form": form})
         else:
@@ -262,20 +307,28 @@ class ConsultationCreateView(LoginRequiredMixin, View):
         status = form.cleaned_data["status"]
         end_date = start_date + timedelta(minutes=30)
 
-        Consultation.objects.create(
-            clinic=clinic,
-            doctor=doctor,
-            status=status,
-            start_date=start_date,
-            end_date=end_date,
-        )
+        try:
+            with transaction.atomic():
+                consultation = Consultation.objects.create(
+                    clinic=clinic,
+                    doctor=doctor,
+                    status=status,
+                    start_date=start_date,
+                    end_date=end_date,
+                )
+        except IntegrityError as error:
+            if not Consultation.is_doctor_overlap(error):
+                raise
+            form.add_error("start_date", Consultation.DOCTOR_OVERLAP_ERROR)
+            return render(request, self.template_name, {"form": form})
+        schedule_status_transitions(consultation)
 
         return redirect(self.success_url)
 
 
 class ConsultationUpdateView(LoginRequiredMixin, ConsultationQuerysetMixin, UpdateView):
     model = Consultation
-    fields = ["clinic", "doctor", "patient", "status", "start_date", "end_date"]
+    form_class = ConsultationUpdateForm
     success_url = reverse_lazy("consultations:list")
     template_name = "consultations/form.html"
 
@@ -292,6 +345,25 @@ class ConsultationUpdateView(LoginRequiredMixin, ConsultationQuerysetMixin, Upda
     def get_queryset(self):
         return super().get_queryset()
 
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        # Врачи и пациенты выводятся через пользователя: одним запросом
+        form.fields["doctor"].queryset = Doctor.objects.select_related("user")
+        form.fields["patient"].queryset = Patient.objects.select_related("user")
+        return form
+
+    def form_valid(self, form):
+        try:
+            with transaction.atomic():
+                response = super().form_valid(form)
+        except IntegrityError as error:
+            if not Consultation.is_doctor_overlap(error):
+                raise
+            form.add_error("start_date", Consultation.DOCTOR_OVERLAP_ERROR)
+            return self.form_invalid(form)
+        schedule_status_transitions(self.object)
+        return response
+
 
 class ConsultationDeleteView(LoginRequiredMixin, ConsultationQuerysetMixin, DeleteView):
     model = Consultation
@@ -316,24 +388,125 @@ class ConsultationRegisterView(LoginRequiredMixin, View):
     success_url = reverse_lazy("consultations:list")
 
     def post(self, request, pk, *args, **kwargs):
-        try:
-            patient = Patient.objects.get(user=request.user)
-        except Patient.DoesNotExist:
+        if getattr(request.user, "role", None) != User.PATIENT:
             return redirect(self.success_url)
 
-        try:
-            consultation = Consultation.objects.select_related("patient").get(pk=pk)
-        except Consultation.DoesNotExist:
+        hold = SlotHold(pk, request.user.pk)
+        if not hold.acquire():
+            messages.warning(request, SLOT_HELD_MESSAGE)
             return redirect(self.success_url)
 
-        if (
-            getattr(request.user, "role", None) == User.PATIENT
-            and consultation.patient is None
-            and consultation.start_date > timezone.now()
-        ):
-            consultation.patient = patient
-            consultation.status = Consultation.CONFIRMED
-            consultation.save(update_fields=["patient", "status"])
+        patient = request.user.profile
+        if patient is None:
+            hold.release()
             return redirect(self.success_url)
 
+        if not book_consultation(pk, patient):
+            hold.release()
+            messages.warning(
+                request,
+                "Не удалось записаться: консультация уже занята или началась.",
+            )
+        # После успешной записи удержание истекает само и до тех пор
+        # отсекает остальных пациентов без обращения к базе данных
         return redirect(self.success_url)
+
+
+def full_name(prefix):
+    return Concat(
+        F(f"{prefix}__first_name"),
+        Value(" "),
+        F(f"{prefix}__middle_name"),
+        Value(" "),
+        F(f"{prefix}__last_name"),
+    )
+
+
+class ConsultationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Консультации для мобильных и интеграционных клиентов. Доступ как у
+    HTML-представлений (ConsultationQuerysetMixin), строки читаются
+    через values() без сборки моделей.
+    """
+
+    serializer_class = ConsultationSerializer
+    pagination_class = ConsultationCursorPagination
+
+    def get_queryset(self):
+        queryset = scope_consultations(Consultation.objects.all(), self.request.user)
+        return queryset.values(
+            "id",
+            "status",
+            "start_date",
+            "end_date",
+            "updated_at",
+            "clinic_id",
+            "doctor_id",
+            "patient_id",
+            clinic_name=F("clinic__name"),
+            doctor_name=full_name("doctor__user"),
+            patient_name=Case(
+                When(patient__isnull=True, then=None),
+                default=full_name("patient__user"),
+            ),
+        )
+
+    def filter_queryset(self, queryset):
+        params = ConsultationFilterSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+
+        if filters.get("status"):
+            queryset = queryset.filter(status__in=filters["status"])
+        if "doctor" in filters:
+            queryset = queryset.filter(doctor_id=filters["doctor"])
+        if "clinic" in filters:
+            queryset = queryset.filter(clinic_id=filters["clinic"])
+        if "date_from" in filters:
+            queryset = queryset.filter(start_date__gte=filters["date_from"])
+        if "date_to" in filters:
+            queryset = queryset.filter(start_date__lt=filters["date_to"])
+        return queryset
+
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Пакет операций {"operations": [{"op": "create" | "update" | "delete",
+        ...}]}: применяется целиком в одной транзакции либо не применяется,
+        в ответе результат по каждой операции.
+        """
+        user = request.user
+        is_admin = (
+            getattr(user, "is_staff", False)
+            or getattr(user, "role", None) == User.ADMIN
+        )
+        if not is_admin and (
+            getattr(user, "role", None) != User.DOCTOR or user.profile is None
+        ):
+            raise PermissionDenied("Пакетные изменения доступны врачам и админам.")
+
+        operations = (
+            request.data.get("operations") if isinstance(request.data, dict) else None
+        )
+        if not isinstance(operations, list) or not operations:
+            raise ValidationError({"operations": "Нужен непустой список операций."})
+        limit = settings.CONSULTATIONS_BULK_MAX_OPERATIONS
+        if len(operations) > limit:
+            raise ValidationError({"operations": f"Не больше {limit} операций."})
+
+        items = [ConsultationOperationSerializer(data=item) for item in operations]
+        if not all([item.is_valid() for item in items]):
+            results = [
+                {"index": index, "errors": item.errors}
+                for index, item in enumerate(items)
+                if item.errors
+            ]
+            return Response({"results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        applied, results = apply_operations(
+            [item.validated_data for item in items], user
+        )
+        return Response(
+            {"results": results},
+            status=status.HTTP_200_OK if applied else status.HTTP_400_BAD_REQUEST,
+        )
@@ -0,0 +1,20 @@
+import time
+
+
+class QueryStats:
+    """
+    Обертка для connection.execute_wrapper(): считает выполненные запросы
+    и суммарное время их выполнения в БД.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
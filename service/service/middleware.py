@@ -0,0 +1,48 @@
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+from service.db import QueryStats
+
+logger = logging.getLogger("service.queries")
+
+
+class QueryBudgetMiddleware:
+    """
+    Считает запросы к БД и время в БД за запрос по имени представления.
+    Превышение бюджета из QUERY_BUDGETS пишется в лог; при DEBUG счетчики
+    также отдаются в заголовках ответа.
+    """
+
+    COUNT_HEADER = "X-DB-Query-Count"
+    TIME_HEADER = "X-DB-Query-Time"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = QueryStats()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        request.query_stats = stats
+
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else None
+        db_time = stats.duration * 1000
+        logger.debug("%s: %d запросов, %.1f мс в БД", view_name, stats.count, db_time)
+
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is not None and stats.count > budget:
+            logger.warning(
+                "%s: %d запросов при бюджете %d (%.1f мс в БД)",
+                view_name,
+                stats.count,
+                budget,
+                db_time,
+            )
+
+        if settings.DEBUG:
+            response[self.COUNT_HEADER] = str(stats.count)
+            response[self.TIME_HEADER] = f"{db_time:.1f}"
+        return response
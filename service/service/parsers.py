@@ -0,0 +1,57 @@
+"""
+JSON-парсер API: orjson вместо json.loads и кэш преобразования ключей
+из camelCase. Результат тот же, что у CamelCaseJSONParser.
+"""
+
+import json
+from functools import lru_cache
+
+import orjson
+from django.conf import settings
+from djangorestframework_camel_case.parser import CamelCaseJSONParser
+from djangorestframework_camel_case.util import camel_to_underscore
+from rest_framework.exceptions import ParseError
+
+
+@lru_cache(maxsize=4096)
+def underscore_key(key, no_underscore_before_number=False):
+    return camel_to_underscore(
+        key, no_underscore_before_number=no_underscore_before_number
+    )
+
+
+def to_underscore(data, no_underscore_before_number):
+    if isinstance(data, dict):
+        return {
+            (
+                underscore_key(key, no_underscore_before_number)
+                if isinstance(key, str)
+                else key
+            ): to_underscore(value, no_underscore_before_number)
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [to_underscore(item, no_underscore_before_number) for item in data]
+    return data
+
+
+class ORJSONCamelCaseParser(CamelCaseJSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        options = self.json_underscoreize
+        if options.get("ignore_fields") or options.get("ignore_keys"):
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        try:
+            data = stream.read().decode(encoding)
+            try:
+                parsed = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                # NaN, Infinity и целые больше 64 бит принимает только json
+                parsed = json.loads(data)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
+        return to_underscore(
+            parsed, bool(options.get("no_underscore_before_number"))
+        )
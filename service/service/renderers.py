@@ -0,0 +1,111 @@
+"""
+JSON-рендерер API: camelCase-ключи и orjson вместо json.dumps.
+
+Вывод побайтно совпадает с CamelCaseJSONRenderer. Ключи преобразуются
+по таблице, которая строится один раз на набор полей сериализатора,
+а не регулярным выражением на каждый ключ каждого ответа. Когда быстрый
+путь не может гарантировать тот же вывод (отступы, настройки ignore_*,
+числа в экспоненциальной записи), рендерится прежним способом.
+"""
+
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer
+from djangorestframework_camel_case.util import (
+    camelize,
+    camelize_re,
+    underscore_to_camel,
+)
+
+OPTIONS = (
+    orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+# json.dumps пишет такие числа с экспонентой (1e+16, 1e-05), orjson — нет
+FLOAT_MIN = 1e-4
+FLOAT_MAX = 1e16
+
+
+class Fallback(Exception):
+    """Данные нельзя отрендерить быстрым путем без расхождений в выводе."""
+
+
+def camelize_key(key):
+    if isinstance(key, Promise):
+        key = force_str(key)
+    if isinstance(key, str) and "_" in key:
+        return re.sub(camelize_re, underscore_to_camel, key)
+    return key
+
+
+@lru_cache(maxsize=1024)
+def camelize_keys(keys):
+    """Ключи словаря в camelCase; кэшируется по набору ключей целиком."""
+    if any(isinstance(key, Promise) for key in keys):
+        # Ленивые строки зависят от активного языка, их не кэшируем
+        return None
+    return tuple(camelize_key(key) for key in keys)
+
+
+def check_float(value):
+    # NaN и бесконечности тоже не проходят сравнение
+    if value and not FLOAT_MIN <= abs(value) < FLOAT_MAX:
+        raise Fallback
+    return value
+
+
+def to_camel(data):
+    """То же, что camelize без ignore_*, но ключи берутся из таблицы."""
+    if isinstance(data, dict):
+        keys = tuple(data)
+        new_keys = camelize_keys(keys) or tuple(camelize_key(key) for key in keys)
+        return dict(zip(new_keys, map(to_camel, data.values())))
+    if isinstance(data, (list, tuple)):
+        return [to_camel(item) for item in data]
+    if data is None or isinstance(data, (str, bool, int)):
+        return data
+    if isinstance(data, float):
+        return check_float(data)
+    if isinstance(data, Decimal):
+        # JSONEncoder DRF превращает Decimal во float
+        return check_float(float(data))
+    return camelize(data)
+
+
+class ORJSONCamelCaseRenderer(CamelCaseJSONRenderer):
+    def fast_path(self, indent):
+        options = self.json_underscoreize
+        return (
+            indent is None
+            and self.compact
+            and not self.ensure_ascii
+            and not options.get("ignore_fields")
+            and not options.get("ignore_keys")
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if self.fast_path(indent):
+            try:
+                ret = orjson.dumps(
+                    to_camel(data),
+                    default=self.encoder_class().default,
+                    option=OPTIONS,
+                )
+            except (Fallback, orjson.JSONEncodeError):
+                pass
+            else:
+                # Как и JSONRenderer, экранируем разделители строк для JavaScript
+                return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                    b"\xe2\x80\xa9", b"\\u2029"
+                )
+        return super().render(data, accepted_media_type, renderer_context)
@@ -113,6 +113,7 @@ SIMPLE_JWT = {
 
 
 MIDDLEWARE = [
+    "service.middleware.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -182,17 +183,17 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_RENDERER_CLASSES": (
-        "djangorestframework_camel_case.render.CamelCaseJSONRenderer",
+        "service.renderers.ORJSONCamelCaseRenderer",
         "djangorestframework_camel_case.render.CamelCaseBrowsableAPIRenderer",
     ),
     "DEFAULT_PARSER_CLASSES": (
         "djangorestframework_camel_case.parser.CamelCaseFormParser",
         "djangorestframework_camel_case.parser.CamelCaseMultiPartParser",
-        "djangorestframework_camel_case.parser.CamelCaseJSONParser",
+        "service.parsers.ORJSONCamelCaseParser",
         "rest_framework.parsers.FileUploadParser",
     ),
 }
@@ -208,6 +209,88 @@ CELERY_RESULT_EXTENDED = True
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
 
+# Query budgets
+
+# Бюджет запросов к БД на один запрос по имени представления;
+# превышение пишется в лог QueryBudgetMiddleware
+QUERY_BUDGETS = {
+    "consultations:list": 8,
+    "consultations:detail": 6,
+    "consultations:create": 12,
+    "consultations:register": 6,
+}
+
+
+# Consultations
+
+# Размер корзины и горизонт планировщика смены статусов
+CONSULTATIONS_SCHEDULER_BUCKET = timedelta(minutes=1)
+CONSULTATIONS_SCHEDULER_HORIZON = timedelta(minutes=10)
+
+# Удаление просроченных консультаций: размер пачки и лимит времени на запуск
+CONSULTATIONS_PURGE_BATCH_SIZE = env.int("CONSULTATIONS_PURGE_BATCH_SIZE", default=500)
+CONSULTATIONS_PURGE_TIME_LIMIT = timedelta(
+    seconds=env.int("CONSULTATIONS_PURGE_TIME_LIMIT", default=30)
+)
+
+# Параллельное обслуживание: число диапазонов первичных ключей и их
+# минимальный размер, ниже которого задача выполняется на одном воркере
+CONSULTATIONS_MAINTENANCE_SHARDS = env.int(
+    "CONSULTATIONS_MAINTENANCE_SHARDS", default=4
+)
+CONSULTATIONS_MAINTENANCE_MIN_SHARD_SIZE = 10000
+
+# Время жизни аренды периодических задач; пока задача работает,
+# аренда продлевается каждую треть этого времени
+CONSULTATIONS_MAINTENANCE_LEASE_TTL = timedelta(minutes=5)
+
+# Считать ли в метриках смены статусов строки-кандидаты (rows_scanned).
+# Это отдельный COUNT почти по всей таблице, поэтому по умолчанию выключено
+# и rows_scanned этой фазы равен 0
+CONSULTATIONS_MAINTENANCE_COUNT_SCANNED = env.bool(
+    "CONSULTATIONS_MAINTENANCE_COUNT_SCANNED", default=False
+)
+
+# Генерация слотов по шаблонам расписания: размер пачки bulk_create
+# и количество дней вперед для периодической задачи
+CONSULTATIONS_SLOT_BATCH_SIZE = 1000
+CONSULTATIONS_SLOT_GENERATION_DAYS = 30
+
+# Время удержания слота пациентом на время записи
+CONSULTATIONS_SLOT_HOLD_TTL = timedelta(seconds=15)
+
+# Сколько хранится счетчик конфликтов удержания по отдельному слоту;
+# общий счетчик хранится бессрочно
+CONSULTATIONS_SLOT_CONTENTION_TTL = timedelta(days=1)
+
+# Кэш страниц списка консультаций (0 отключает) и время блокировки,
+# пока одна страница строится для всех одновременных запросов
+CONSULTATIONS_LIST_CACHE_TTL = timedelta(
+    seconds=env.int("CONSULTATIONS_LIST_CACHE_TTL", default=60)
+)
+CONSULTATIONS_LIST_CACHE_LOCK_TTL = timedelta(seconds=5)
+
+# Время хранения списков выбора клиник и врачей в формах
+CONSULTATIONS_CHOICES_CACHE_TTL = timedelta(minutes=10)
+
+# Максимальное количество операций в пакетном изменении консультаций
+CONSULTATIONS_BULK_MAX_OPERATIONS = 500
+
+# Время хранения отрисованных строк списка консультаций; ключ строки
+# включает updated_at, поэтому измененная строка рисуется заново
+CONSULTATIONS_ROW_CACHE_TTL = timedelta(minutes=10)
+
+
+# Users
+
+# Время хранения профиля врача/пациента в кэше между запросами
+USERS_PROFILE_CACHE_TTL = timedelta(minutes=5)
+
+# Время хранения пользователя API по public_id из JWT; изменения
+# пользователя сбрасывают кэш сразу
+USERS_AUTH_CACHE_TTL = timedelta(minutes=1)
+
+
 # Cache
 
 CACHES = {
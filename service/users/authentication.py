@@ -0,0 +1,55 @@
+"""
+JWT-аутентификация API с кэшем пользователя.
+
+Пользователь хранится в кэше по public_id из токена вместе с отпечатком
+пароля, который simplejwt кладет в токен при CHECK_REVOKE_TOKEN. Токен
+с другим отпечатком проверяется по БД как обычно. Запись удаляется при
+сохранении или удалении пользователя, в том числе при смене пароля.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+AUTH_USER_KEY = "users:auth:{}"
+
+
+def password_fingerprint(user):
+    if not api_settings.CHECK_REVOKE_TOKEN:
+        return None
+    return get_md5_hash_password(user.password)
+
+
+def forget_auth_user(public_id):
+    key = AUTH_USER_KEY.format(public_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        fingerprint = (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+            if api_settings.CHECK_REVOKE_TOKEN
+            else None
+        )
+        key = AUTH_USER_KEY.format(user_id)
+        cached = cache.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        # Проверки активности и отзыва токена выполняет simplejwt
+        user = super().get_user(validated_token)
+        cache.set(
+            key,
+            (password_fingerprint(user), user),
+            timeout=int(settings.USERS_AUTH_CACHE_TTL.total_seconds()),
+        )
+        return user
@@ -1,6 +1,7 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils.functional import cached_property
 from service.models import PublicModel
 
 
@@ -57,6 +58,13 @@ class User(AbstractUser, PublicModel):
     def __str__(self):
         return f"{self.first_name} {self.middle_name} {self.last_name}"
 
+    @cached_property
+    def profile(self):
+        """Профиль врача или пациента по роли пользователя либо None."""
+        from users.profiles import load_profile
+
+        return load_profile(self)
+
 
 class Doctor(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
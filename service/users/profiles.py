@@ -0,0 +1,44 @@
+"""
+Профиль врача или пациента пользователя.
+
+Профиль читается один раз на объект пользователя (а значит, на запрос)
+и хранится в кэше между запросами до изменения профиля или пользователя.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from users.models import Doctor, Patient, User
+
+PROFILE_KEY = "users:profile:{}"
+PROFILE_MODELS = {User.DOCTOR: Doctor, User.PATIENT: Patient}
+
+# Отсутствие профиля тоже кэшируется, None кэш не отличает от промаха
+MISSING = False
+
+
+def load_profile(user):
+    model = PROFILE_MODELS.get(getattr(user, "role", None))
+    if model is None or user.pk is None:
+        return None
+
+    key = PROFILE_KEY.format(user.pk)
+    profile = cache.get(key)
+    if profile is None:
+        profile = model.objects.filter(user_id=user.pk).first() or MISSING
+        cache.set(
+            key,
+            profile,
+            timeout=int(settings.USERS_PROFILE_CACHE_TTL.total_seconds()),
+        )
+    if not isinstance(profile, model):
+        return None
+    profile.user = user
+    return profile
+
+
+def forget_profile(user_id):
+    key = PROFILE_KEY.format(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
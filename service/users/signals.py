@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import forget_auth_user
+from users.models import Doctor, Patient, User
+from users.profiles import forget_profile
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=Patient)
+def forget_changed_profile(sender, instance, raw=False, **kwargs):
+    if not raw:
+        forget_profile(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def forget_user_profile(sender, instance, created, raw=False, **kwargs):
+    # Смена роли меняет модель профиля
+    if not raw and not created:
+        forget_profile(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_authenticated_user(sender, instance, raw=False, **kwargs):
+    # Смена пароля, роли или is_active должна сразу действовать в API
+    if not raw:
+        forget_auth_user(instance.public_id)
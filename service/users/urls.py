@@ -1,8 +1,11 @@
 from django.urls import include, path
 from rest_framework.routers import SimpleRouter
+from consultations.views import ConsultationViewSet
 from users.views import UserViewSet
 
 router = SimpleRouter()
+# До UserViewSet: его маршрут /<public_id>/ перехватил бы "consultations"
+router.register("consultations", ConsultationViewSet, basename="consultation")
 router.register("", UserViewSet)
 
 urlpatterns = [